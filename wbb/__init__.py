@@ -26,26 +26,46 @@ import logging
 import os
 import sys
 import time
+from functools import lru_cache
+from inspect import getfullargspec
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
 from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
-from pyrogram import Client, filters, __version__ as pyrogram_version
+from pyrogram import Client, __version__ as pyrogram_version
+from pyrogram.filters import Filter
 from pyrogram.types import Message
 from pyromod import listen
 from Python_ARQ import ARQ
 from telegraph import Telegraph
 
-# Logging configuration
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('bot_debug.log', encoding='utf-8')
-    ]
-)
+# Use uvloop's event loop policy before any loop gets created
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+# Logging configuration (only once, even if this module is re-imported)
+root_logger = logging.getLogger()
+if not root_logger.handlers:
+    log_formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    file_handler = RotatingFileHandler(
+        'bot_debug.log',
+        maxBytes=20_000_000,
+        backupCount=3,
+        encoding='utf-8',
+    )
+    stream_handler = logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(log_formatter)
+        root_logger.addHandler(handler)
+    root_logger.setLevel(logging.INFO)
 logger = logging.getLogger("wbb")
+log = logger
 
 # Set log levels for noisy libraries
 logging.getLogger('pyrogram').setLevel(logging.WARNING)
@@ -64,19 +84,34 @@ except ImportError:
     from sample_config import *
     logger.info("Loaded configuration from sample_config.py")
 
+class SudoersFilter(Filter, set):
+    """Set of sudo user IDs that can also be used as a pyrogram filter.
+
+    Unlike filters.user() it only checks the sender ID, skipping the
+    username and "me" matching on every update.
+    """
+
+    async def __call__(self, _, update):
+        user = update.from_user
+        return user is not None and user.id in self
+
+
 # Global variables
-USERBOT_PREFIX = USERBOT_PREFIX
-GBAN_LOG_GROUP_ID = GBAN_LOG_GROUP_ID
-WELCOME_DELAY_KICK_SEC = WELCOME_DELAY_KICK_SEC
-LOG_GROUP_ID = LOG_GROUP_ID
-MESSAGE_DUMP_CHAT = MESSAGE_DUMP_CHAT
 MOD_LOAD = []
 MOD_NOLOAD = []
-SUDOERS = filters.user()
+# Modules without handlers that may be executed on first attribute access
+MOD_LAZY = []
+SUDOERS = SudoersFilter()
 bot_start_time = time.time()
 
 # MongoDB connection
-mongo_client = MongoClient(MONGO_URL)
+mongo_client = MongoClient(
+    MONGO_URL,
+    maxPoolSize=50,
+    minPoolSize=5,
+    maxIdleTimeMS=60000,
+    serverSelectionTimeoutMS=5000,
+)
 db = mongo_client.wbb
 
 async def load_sudoers():
@@ -84,25 +119,24 @@ async def load_sudoers():
     global SUDOERS
     logger.info("Loading sudoers")
     sudoersdb = db.sudoers
-    sudoers = await sudoersdb.find_one({"sudo": "sudo"})
+    sudoers = await sudoersdb.find_one(
+        {"sudo": "sudo"}, {"sudoers": 1, "_id": 0}
+    )
     sudoers = [] if not sudoers else sudoers["sudoers"]
     
-    # Add users from config to sudoers
-    for user_id in SUDO_USERS_ID:
-        SUDOERS.add(user_id)
-        if user_id not in sudoers:
-            sudoers.append(user_id)
-            await sudoersdb.update_one(
-                {"sudo": "sudo"},
-                {"$set": {"sudoers": sudoers}},
-                upsert=True,
-            )
+    # Persist users from config that aren't stored yet in a single write
+    missing = [user_id for user_id in SUDO_USERS_ID if user_id not in sudoers]
+    if missing:
+        await sudoersdb.update_one(
+            {"sudo": "sudo"},
+            {"$addToSet": {"sudoers": {"$each": missing}}},
+            upsert=True,
+        )
     
     # Add all sudoers to SUDOERS set
-    for user_id in sudoers:
-        SUDOERS.add(user_id)
+    SUDOERS.update(sudoers, SUDO_USERS_ID)
     
-    logger.info(f"Loaded {len(SUDOERS)} sudoers")
+    logger.info("Loaded %d sudoers", len(SUDOERS))
 
 # Initialize Pyrogram clients
 app = None
@@ -110,10 +144,16 @@ app2 = None
 
 # Initialize main bot client
 try:
-    app = Client("sessions/wbb", bot_token=BOT_TOKEN, api_id=API_ID, api_hash=API_HASH)
+    app = Client(
+        "sessions/wbb",
+        bot_token=BOT_TOKEN,
+        api_id=API_ID,
+        api_hash=API_HASH,
+        workers=min(32, (os.cpu_count() or 4) * 4),
+    )
     logger.info("Main bot client initialized")
 except Exception as e:
-    logger.error(f"Failed to initialize main bot client: {e}")
+    logger.error("Failed to initialize main bot client: %s", e)
     app = None
 
 # Initialize userbot client if SESSION_STRING is provided
@@ -127,7 +167,7 @@ if SESSION_STRING:
         )
         logger.info("Userbot client initialized")
     except Exception as e:
-        logger.error(f"Failed to initialize userbot client: {e}")
+        logger.error("Failed to initialize userbot client: %s", e)
         app2 = None
 else:
     logger.info("No SESSION_STRING provided, userbot disabled")
@@ -138,104 +178,133 @@ BOT_DC_ID = BOT_ID = 0
 USERBOT_NAME = USERBOT_USERNAME = USERBOT_MENTION = ""
 USERBOT_DC_ID = USERBOT_ID = 0
 
+# Shared HTTP session; keep-alive connections are reused across ARQ and API calls
+aiohttpsession = ClientSession(
+    connector=TCPConnector(
+        limit=256,
+        limit_per_host=64,
+        ttl_dns_cache=300,
+        keepalive_timeout=75,
+        enable_cleanup_closed=True,
+    ),
+    timeout=ClientTimeout(total=30, connect=10),
+)
+
 # Initialize ARQ client
-aiohttpsession = ClientSession()
 arq = ARQ(ARQ_API_URL, ARQ_API_KEY, aiohttpsession)
 
-# Initialize Telegraph client (will be configured after bot starts)
-telegraph = Telegraph(domain="graph.org")
+class LazyTelegraph:
+    """Telegraph client whose account is only created on first use"""
 
-def userbot_on_message(*args, **kwargs):
-    """Safe decorator for userbot message handlers.
-    
-    This ensures that @app2.on_message handlers don't break if userbot is not available.
-    
-    Usage:
-        @userbot_on_message(filters.command("start"))
-        async def start(_, message):
-            await message.reply("Hello from userbot!")
-    """
-    if app2:
-        return app2.on_message(*args, **kwargs)
-    
-    # Return a dummy decorator if userbot is not available
-    def decorator(func):
-        return func
-    return decorator
+    def __init__(self):
+        self._client = None
+
+    def _ensure(self):
+        if self._client is None:
+            client = Telegraph(domain="graph.org")
+            try:
+                client.create_account(short_name=BOT_USERNAME or "wbb")
+            except Exception as e:
+                log.error("Failed to initialize Telegraph: %s", e)
+                raise
+            log.info("Initialized Telegraph client for @%s", BOT_USERNAME)
+            self._client = client
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self._ensure(), name)
+
+
+telegraph = LazyTelegraph()
+
+def _skip_handler(func):
+    return func
+
+if app2:
+    userbot_on_message = app2.on_message
+else:
+    def userbot_on_message(*args, **kwargs):
+        """Safe decorator for userbot message handlers.
+        
+        This ensures that @app2.on_message handlers don't break if userbot is not available.
+        
+        Usage:
+            @userbot_on_message(filters.command("start"))
+            async def start(_, message):
+                await message.reply("Hello from userbot!")
+        """
+        # Return a dummy decorator since userbot is not available
+        return _skip_handler
+
+async def _start_client(client):
+    """Start a client and return its own user object"""
+    await client.start()
+    return await client.get_me()
 
 async def start_bot():
     """Start the bot and userbot clients"""
     global BOT_NAME, BOT_USERNAME, BOT_MENTION, BOT_DC_ID, BOT_ID
     global USERBOT_NAME, USERBOT_USERNAME, USERBOT_MENTION, USERBOT_DC_ID, USERBOT_ID
+    global app2
     
-    # Load sudoers first
-    await load_sudoers()
-    
-    # Start main bot
     if app is None:
         logger.error("Cannot start: Main bot client is not initialized")
         return False
-        
-    try:
-        logger.info("Starting main bot...")
-        await app.start()
-        
-        # Get bot info
-        me = await app.get_me()
-        BOT_NAME = me.first_name + (" " + me.last_name if me.last_name else "")
-        BOT_USERNAME = me.username
-        BOT_MENTION = me.mention
-        BOT_DC_ID = me.dc_id
-        BOT_ID = me.id
-        
-        logger.info(f"Bot started: {BOT_NAME} (@{BOT_USERNAME})")
-    except Exception as e:
-        logger.error(f"Failed to start main bot: {e}")
+    
+    # Load sudoers while both clients do their handshakes
+    logger.info("Starting main bot...")
+    if app2 is not None:
+        logger.info("Starting userbot...")
+    sudoers_result, bot_me, userbot_me = await asyncio.gather(
+        load_sudoers(),
+        _start_client(app),
+        _start_client(app2) if app2 is not None else asyncio.sleep(0),
+        return_exceptions=True,
+    )
+    if isinstance(sudoers_result, Exception):
+        raise sudoers_result
+    
+    if isinstance(bot_me, Exception):
+        logger.error("Failed to start main bot: %s", bot_me)
         return False
     
-    # Start userbot if available
+    BOT_NAME = " ".join(filter(None, (bot_me.first_name, bot_me.last_name)))
+    BOT_USERNAME = bot_me.username
+    BOT_MENTION = bot_me.mention
+    BOT_DC_ID = bot_me.dc_id
+    BOT_ID = bot_me.id
+    logger.info("Bot started: %s (@%s)", BOT_NAME, BOT_USERNAME)
+    
+    # Create the Telegraph account now that the username is known,
+    # a failure is logged and retried on first use
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, telegraph._ensure)
+    except Exception:
+        pass
+    
     if app2 is not None:
-        try:
-            logger.info("Starting userbot...")
-            await app2.start()
-            
-            # Get userbot info
-            me2 = await app2.get_me()
-            USERBOT_NAME = me2.first_name + (" " + me2.last_name if me2.last_name else "")
-            USERBOT_USERNAME = me2.username
-            USERBOT_MENTION = me2.mention
-            USERBOT_DC_ID = me2.dc_id
-            USERBOT_ID = me2.id
-            
-            logger.info(f"Userbot started: {USERBOT_NAME} (@{USERBOT_USERNAME})")
-        except Exception as e:
-            logger.error(f"Failed to start userbot: {e}")
+        if isinstance(userbot_me, Exception):
+            logger.error("Failed to start userbot: %s", userbot_me)
             app2 = None
-    
-    # Initialize Telegraph with bot username if available
-        if userbot_me.id not in SUDOERS:
-            SUDOERS.add(userbot_me.id)
-            log.info(f"Added userbot {userbot_me.id} to sudoers")
+        else:
+            USERBOT_NAME = " ".join(
+                filter(None, (userbot_me.first_name, userbot_me.last_name))
+            )
+            USERBOT_USERNAME = userbot_me.username
+            USERBOT_MENTION = userbot_me.mention
+            USERBOT_DC_ID = userbot_me.dc_id
+            USERBOT_ID = userbot_me.id
+            logger.info("Userbot started: %s (@%s)", USERBOT_NAME, USERBOT_USERNAME)
+            if userbot_me.id not in SUDOERS:
+                SUDOERS.add(userbot_me.id)
+                log.info("Added userbot %s to sudoers", userbot_me.id)
     
     log.info("Bot initialization complete")
-    
-    # Initialize Telegraph after we have the bot username
-    init_telegraph()
 
-# Initialize Telegraph client with a default name, will be updated after bot starts
-telegraph = Telegraph(domain="graph.org")
 
-def init_telegraph():
-    """Initialize the Telegraph client with the bot's username"""
-    try:
-        # This will be called after the bot is started
-        if BOT_USERNAME:
-            telegraph.create_account(short_name=BOT_USERNAME)
-            log.info(f"Initialized Telegraph client for @{BOT_USERNAME}")
-        else:
-            log.warning("Could not initialize Telegraph: BOT_USERNAME not set")
-    except Exception as e:
-        log.error(f"Failed to initialize Telegraph: {e}")
+@lru_cache(maxsize=32)
+def _arg_names(func):
+    return frozenset(getfullargspec(func).args)
 
 
 async def eor(msg: Message, **kwargs):
@@ -244,5 +313,5 @@ async def eor(msg: Message, **kwargs):
         if msg.from_user
         else msg.reply
     )
-    spec = getfullargspec(func.__wrapped__).args
+    spec = _arg_names(func.__wrapped__)
     return await func(**{k: v for k, v in kwargs.items() if k in spec})
@@ -22,7 +22,6 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 import asyncio
-import importlib
 import re
 import sys
 import traceback
@@ -40,7 +39,6 @@ from pyrogram.types import (
     ReplyKeyboardRemove,
 )
 from pyrogram.enums import ParseMode, ChatType
-from uvloop import install
 
 from wbb import (
     BOT_NAME,
@@ -52,11 +50,19 @@ from wbb import (
     log,
 )
 from wbb.core.keyboard import ikb
-from wbb.modules import ALL_MODULES
+from wbb.modules import (
+    ALL_MODULES,
+    MOD_LAZY,
+    cached_import,
+)
 from wbb.modules.sudoers import bot_sys_stats
 from wbb.utils import paginate_modules
 from wbb.utils.constants import MARKDOWN
-from wbb.utils.dbfunctions import clean_restart_stage, get_rules
+from wbb.utils.dbfunctions import (
+    clean_restart_stage,
+    ensure_indexes,
+    get_rules,
+)
 from wbb.utils.functions import extract_text_and_keyb
 
 HELPABLE = {}
@@ -69,6 +75,11 @@ async def start_bot():
     print(f"Starting bot with {len(ALL_MODULES)} modules to load")
     print("="*80 + "\n")
     
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        print(f"[ERROR] Failed to create database indexes: {e}")
+
     # Initialize modules that need async setup
     try:
         from wbb.modules.greetings import init_greetings
@@ -90,9 +101,14 @@ async def start_bot():
             print(f"\n{'='*50}")
             print(f"[MODULE_LOADER] Importing module: {module_name}")
             
-            # Import the module
-            module_path = f"wbb.modules.{module_name}"
-            imported_module = importlib.import_module(module_path)
+            # Import the module (reusing it if already imported)
+            imported_module = cached_import(module_name)
+            
+            # Lazy modules have no handlers or help; inspecting them would
+            # execute their body right away
+            if module_name in MOD_LAZY:
+                print(f"[MODULE_LOADER] Deferred lazy module: {module_name}")
+                continue
             
             # Check if module has required attributes
             if not hasattr(imported_module, "__MODULE__") or not imported_module.__MODULE__:
@@ -151,15 +167,12 @@ async def start_bot():
         print(f"{i}. {module}")
     
     print("\n" + "="*80 + "\n")
-    bot_modules = ""
-    j = 1
-    for i in ALL_MODULES:
-        if j == 4:
-            bot_modules += "|{:<15}|\n".format(i)
-            j = 0
-        else:
-            bot_modules += "|{:<15}".format(i)
-        j += 1
+    rows = (ALL_MODULES[i : i + 4] for i in range(0, len(ALL_MODULES), 4))
+    bot_modules = "".join([
+        "".join(["|{:<15}".format(module) for module in row])
+        + ("|\n" if len(row) == 4 else "")
+        for row in rows
+    ])
     print("+===============================================================+")
     print("|                              WBB                              |")
     print("+===============+===============+===============+===============+")
@@ -445,7 +458,7 @@ Also you can ask anything in Support Group.
     )
 
 
-@app.on_callback_query(filters.regex("bot_commands"))
+@app.on_callback_query(filters.regex("^bot_commands$"))
 async def commands_callbacc(_, CallbackQuery):
     text, keyboard = await help_parser(CallbackQuery.from_user.mention)
     await app.send_message(
@@ -457,22 +470,21 @@ async def commands_callbacc(_, CallbackQuery):
     await CallbackQuery.message.delete()
 
 
-@app.on_callback_query(filters.regex("stats_callback"))
+@app.on_callback_query(filters.regex("^stats_callback$"))
 async def stats_callbacc(_, CallbackQuery):
     text = await bot_sys_stats()
     await app.answer_callback_query(CallbackQuery.id, text, show_alert=True)
 
 
-@app.on_callback_query(filters.regex(r"help_(.*?)"))
-async def help_button(client, query):
-    home_match = re.match(r"help_home\((.+?)\)", query.data)
-    mod_match = re.match(r"help_module\((.+?)\)", query.data)
-    prev_match = re.match(r"help_prev\((.+?)\)", query.data)
-    next_match = re.match(r"help_next\((.+?)\)", query.data)
-    back_match = re.match(r"help_back", query.data)
-    create_match = re.match(r"help_create", query.data)
-    top_text = f"""
-Hello {query.from_user.first_name}, My name is {BOT_NAME}.
+HELP_CALLBACK_RE = re.compile(
+    r"help_(?P<action>home|module|prev|next)\((?P<arg>.+?)\)"
+    r"|help_(?P<plain>back|create)"
+)
+
+
+def help_top_text(first_name):
+    return f"""
+Hello {first_name}, My name is {BOT_NAME}.
 I'm a group management bot with some useful features.
 You can choose an option below, by clicking a button.
 Also you can ask anything in Support Group.
@@ -481,8 +493,14 @@ General command are:
  - /start: Start the bot
  - /help: Give this message
  """
-    if mod_match:
-        module = (mod_match.group(1)).replace(" ", "_")
+
+
+@app.on_callback_query(filters.regex(r"^help_"))
+async def help_button(client, query):
+    match = HELP_CALLBACK_RE.match(query.data)
+    action = match and (match["action"] or match["plain"])
+    if action == "module":
+        module = (match["arg"]).replace(" ", "_")
         text = (
             "{} **{}**:\n".format(
                 "Here is the help for", HELPABLE[module].__MODULE__
@@ -503,7 +521,7 @@ General command are:
             ),
             link_preview_options=LinkPreviewOptions(is_disabled=True)
         )
-    elif home_match:
+    elif action == "home":
         await app.send_message(
             query.from_user.id,
             text=home_text_pm,
@@ -511,36 +529,36 @@ General command are:
             link_preview_options=LinkPreviewOptions(is_disabled=True),
         )
         await query.message.delete()
-    elif prev_match:
-        curr_page = int(prev_match.group(1))
+    elif action == "prev":
+        curr_page = int(match["arg"])
         await query.message.edit(
-            text=top_text,
+            text=help_top_text(query.from_user.first_name),
             reply_markup=InlineKeyboardMarkup(
                 paginate_modules(curr_page - 1, HELPABLE, "help")
             ),
             link_preview_options=LinkPreviewOptions(is_disabled=True),
         )
 
-    elif next_match:
-        next_page = int(next_match.group(1))
+    elif action == "next":
+        next_page = int(match["arg"])
         await query.message.edit(
-            text=top_text,
+            text=help_top_text(query.from_user.first_name),
             reply_markup=InlineKeyboardMarkup(
                 paginate_modules(next_page + 1, HELPABLE, "help")
             ),
             link_preview_options=LinkPreviewOptions(is_disabled=True),
         )
 
-    elif back_match:
+    elif action == "back":
         await query.message.edit(
-            text=top_text,
+            text=help_top_text(query.from_user.first_name),
             reply_markup=InlineKeyboardMarkup(
                 paginate_modules(0, HELPABLE, "help")
             ),
             link_preview_options=LinkPreviewOptions(is_disabled=True),
         )
 
-    elif create_match:
+    elif action == "create":
         text, keyboard = await help_parser(query)
         await query.message.edit(
             text=text,
@@ -553,13 +571,6 @@ General command are:
 
 async def main():
     """Main coroutine to start the bot with proper error handling."""
-    # Install uvloop if available
-    try:
-        install()
-        print("[INFO] Using uvloop for better performance")
-    except Exception as e:
-        print(f"[WARNING] Failed to install uvloop: {e}")
-    
     try:
         print("\n[INFO] Starting bot initialization...")
         
@@ -82,8 +82,10 @@ def adminsOnly(permission):
                 return await unauthorised(message, permission, subFunc2)
             # For admins and sudo users
             userID = message.from_user.id
-            permissions = await member_permissions(chatID, userID)
-            if userID not in SUDOERS and permission not in permissions:
+            if (
+                userID not in SUDOERS
+                and permission not in await member_permissions(chatID, userID)
+            ):
                 return await unauthorised(message, permission, subFunc2)
             return await authorised(
                 func, subFunc2, client, message, *args, **kwargs
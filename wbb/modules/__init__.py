@@ -21,42 +21,82 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-import glob
 import importlib
+import importlib.util
+import os
 import sys
 import traceback
-from os.path import basename, dirname, isfile, join
+from os.path import dirname
 
 # Initialize MOD_LOAD and MOD_NOLOAD with defaults if not set
-MOD_LOAD = getattr(sys.modules.get('wbb'), 'MOD_LOAD', [])
-MOD_NOLOAD = getattr(sys.modules.get('wbb'), 'MOD_NOLOAD', [])
+try:
+    from wbb import MOD_LAZY, MOD_LOAD, MOD_NOLOAD
+except ImportError:
+    MOD_LOAD, MOD_NOLOAD, MOD_LAZY = [], [], []
+MOD_LOAD = frozenset(MOD_LOAD)
+MOD_NOLOAD = frozenset(MOD_NOLOAD)
+MOD_LAZY = frozenset(MOD_LAZY)
 
 def __list_all_modules():
-    """Generate a list of all modules in the modules directory."""
-    mod_paths = glob.glob(join(dirname(__file__), "*.py"))
-    all_modules = [
-        basename(f)[:-3]
-        for f in mod_paths
-        if isfile(f)
-        and f.endswith(".py")
-        and not f.endswith("__init__.py")
-        and not f.endswith("__main__.py")
-    ]
+    """Generate a list of all modules in the modules directory.
+
+    A _modules_manifest.py generated at build time (see Dockerfile) is used
+    instead of scanning the directory when present.
+    """
+    # An explicit MOD_LOAD list needs no discovery at all
+    if MOD_LOAD:
+        print(f"[MODULE_LOADER] MOD_LOAD is set, loading only: {sorted(MOD_LOAD)}")
+        return [m for m in MOD_LOAD if m not in MOD_NOLOAD]
     
-    print(f"[MODULE_LOADER] Found {len(all_modules)} modules: {', '.join(all_modules)}")
+    try:
+        from ._modules_manifest import ALL_MODULES as manifest
+        all_modules = list(manifest)
+    except ImportError:
+        with os.scandir(dirname(__file__)) as entries:
+            all_modules = [
+                entry.name[:-3]
+                for entry in entries
+                if entry.name.endswith(".py")
+                and not entry.name.startswith("_")
+                and entry.is_file(follow_symlinks=False)
+            ]
     
-    # Apply MOD_LOAD and MOD_NOLOAD filters
-    if MOD_LOAD:
-        print(f"[MODULE_LOADER] MOD_LOAD is set, filtering modules: {MOD_LOAD}")
-        all_modules = [m for m in all_modules if m in MOD_LOAD]
+    print(f"[MODULE_LOADER] Found {len(all_modules)} modules: {', '.join(all_modules)}")
     
+    # Apply MOD_NOLOAD filter
     if MOD_NOLOAD:
-        print(f"[MODULE_LOADER] MOD_NOLOAD is set, excluding: {MOD_NOLOAD}")
+        print(f"[MODULE_LOADER] MOD_NOLOAD is set, excluding: {sorted(MOD_NOLOAD)}")
         all_modules = [m for m in all_modules if m not in MOD_NOLOAD]
     
     print(f"[MODULE_LOADER] Final module list: {all_modules}")
     return all_modules
 
+def lazy_import(full_name):
+    """Import a module whose body only runs on first attribute access."""
+    spec = importlib.util.find_spec(full_name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[full_name] = module
+    loader.exec_module(module)
+    return module
+
+
+def cached_import(name):
+    """Import wbb.modules.<name>, reusing the sys.modules entry if present.
+
+    Modules listed in MOD_LAZY are imported lazily, so they must not
+    register any handlers at import time.
+    """
+    full_name = f"wbb.modules.{name}"
+    module = sys.modules.get(full_name)
+    if module is not None:
+        return module
+    if name in MOD_LAZY:
+        return lazy_import(full_name)
+    return importlib.import_module(full_name)
+
+
 # Import __main__ module first to set up any required configurations
 print("[MODULE_LOADER] Initializing core modules...")
 try:
@@ -68,6 +108,11 @@ except Exception as e:
 
 # Get the list of all modules to load
 ALL_MODULES = sorted(__list_all_modules())
-__all__ = ALL_MODULES + ["ALL_MODULES"]
+__all__ = ALL_MODULES + [
+    "ALL_MODULES",
+    "MOD_LAZY",
+    "cached_import",
+    "lazy_import",
+]
 
 print(f"[MODULE_LOADER] Total modules to load: {len(ALL_MODULES)}")
@@ -83,7 +83,10 @@ __HELP__ = """/ban - Ban A User
 
 
 from wbb.core.decorators.permissions import adminsOnly
-from wbb.utils.permissions_utils import member_permissions
+from wbb.utils.permissions_utils import (
+    invalidate_member_permissions,
+    member_permissions,
+)
 
 admins_in_chat = {}
 
@@ -112,6 +115,9 @@ async def list_admins(chat_id: int):
 
 @app.on_chat_member_updated()
 async def admin_cache_func(_, cmu: ChatMemberUpdated):
+    member = cmu.new_chat_member or cmu.old_chat_member
+    if member and member.user:
+        invalidate_member_permissions(cmu.chat.id, member.user.id)
     if cmu.old_chat_member and cmu.old_chat_member.promoted_by:
         admins_in_chat[cmu.chat.id] = {
             "last_updated_at": time(),
@@ -698,7 +704,7 @@ async def warn_user(_, message: Message):
         await add_warn(chat_id, await int_to_alpha(user_id), warn)
 
 
-@app.on_callback_query(filters.regex("unwarn_"))
+@app.on_callback_query(filters.regex("^unwarn_"))
 async def remove_warning(_, cq: CallbackQuery):
     from_user = cq.from_user
     chat_id = cq.message.chat.id
@@ -90,7 +90,7 @@ async def approval_command(client, message):
         )
 
 
-@app.on_callback_query(filters.regex("approval(.*)"))
+@app.on_callback_query(filters.regex("^approval(.*)"))
 async def approval_cb(client, cb):
     chat_id = cb.message.chat.id
     from_user = cb.from_user
@@ -194,7 +194,7 @@ async def accept(client, message: ChatJoinRequest):
                 )
 
 
-@app.on_callback_query(filters.regex("manual_(.*)"))
+@app.on_callback_query(filters.regex("^manual_(.*)"))
 async def manual(app, cb):
     chat = cb.message.chat
     from_user = cb.from_user
@@ -69,8 +69,7 @@ async def get_filterss(_, message):
         await message.reply_text("**No blacklisted words in this chat.**")
     else:
         msg = f"List of blacklisted words in {message.chat.title} :\n"
-        for word in data:
-            msg += f"**-** `{word}`\n"
+        msg += "".join([f"**-** `{word}`\n" for word in data])
         await message.reply_text(msg)
 
 
@@ -6,6 +6,7 @@ from wbb.core.decorators.errors import capture_err
 from wbb.utils.dbfunctions import (
     blacklist_chat,
     blacklisted_chats,
+    is_blacklisted_chat,
     whitelist_chat,
 )
 
@@ -30,7 +31,7 @@ async def blacklist_chat_func(_, message: Message):
             "**Usage:**\n/blacklist_chat [CHAT_ID]"
         )
     chat_id = int(message.text.strip().split()[1])
-    if chat_id in await blacklisted_chats():
+    if await is_blacklisted_chat(chat_id):
         return await message.reply_text("Chat is already blacklisted.")
     blacklisted = await blacklist_chat(chat_id)
     if blacklisted:
@@ -48,7 +49,7 @@ async def whitelist_chat_func(_, message: Message):
             "**Usage:**\n/whitelist_chat [CHAT_ID]"
         )
     chat_id = int(message.text.strip().split()[1])
-    if chat_id not in await blacklisted_chats():
+    if not await is_blacklisted_chat(chat_id):
         return await message.reply_text("Chat is already whitelisted.")
     whitelisted = await whitelist_chat(chat_id)
     if whitelisted:
@@ -61,13 +62,13 @@ async def whitelist_chat_func(_, message: Message):
 @app.on_message(filters.command("blacklisted_chats") & SUDOERS)
 @capture_err
 async def blacklisted_chats_func(_, message: Message):
-    text = ""
+    lines = []
     for count, chat_id in enumerate(await blacklisted_chats(), 1):
         try:
             title = (await app.get_chat(chat_id)).title
         except Exception:
             title = "Private"
-        text += f"**{count}. {title}** [`{chat_id}`]\n"
-    if text == "":
+        lines.append(f"**{count}. {title}** [`{chat_id}`]\n")
+    if not lines:
         return await message.reply_text("No blacklisted chats found.")
-    await message.reply_text(text)
+    await message.reply_text("".join(lines))
@@ -25,7 +25,7 @@ from wbb import app
 from wbb.utils.dbfunctions import (
     add_served_chat,
     add_served_user,
-    blacklisted_chats,
+    is_blacklisted_chat,
 )
 from wbb.utils.filter_groups import chat_watcher_group
 
@@ -37,12 +37,11 @@ async def chat_watcher_func(_, message):
         await add_served_user(user_id)
 
     chat_id = message.chat.id
-    blacklisted_chats_list = await blacklisted_chats()
 
     if not chat_id:
         return
 
-    if chat_id in blacklisted_chats_list:
+    if await is_blacklisted_chat(chat_id):
         return await app.leave_chat(chat_id)
 
     await add_served_chat(chat_id)
@@ -10,12 +10,20 @@ Features:
 - Proper error handling and permission checks
 """
 
+from collections import defaultdict
 from pyrogram import filters
-from pyrogram.types import Message
-from typing import Dict, List, Optional, Union
-import re
+from pyrogram.enums import ChatType
+from pyrogram.types import ChatMemberUpdated, Message
+from typing import Dict, List, Optional, Tuple, Union
+import asyncio
+import logging
+import string
+import time
 
 from wbb import app
+from wbb.utils.filter_groups import command_cleaner_group
+
+logger = logging.getLogger(__name__)
 
 # Backward compatibility functions
 async def delete_command_message(message):
@@ -24,7 +32,7 @@ async def delete_command_message(message):
         await message.delete()
         return True
     except Exception as e:
-        print(f"Error in delete_command_message: {e}")
+        logger.error("Error in delete_command_message: %s", e)
         return False
 
 # Alias for older name
@@ -39,125 +47,254 @@ except ImportError:
 # Configuration
 LOG_COMMANDS = True  # Set to False to disable command logging
 LOG_CHAT_ID = LOG_GROUP_ID  # Uses the bot's log group by default
-COMMAND_PATTERN = re.compile(r"^/([a-zA-Z0-9_]+)(@\w+)?(\s|$)")  # Matches /command or /command@botname
 
 # List of commands to ignore (case-insensitive)
 WHITELISTED_COMMANDS = ["start", "help", "settings"]
+_WHITELIST = frozenset(command.lower() for command in WHITELISTED_COMMANDS)
+
+# Deletions are coalesced per chat and flushed with one delete_messages call
+DELETE_BATCH_SIZE = 50  # Flush as soon as this many commands are queued
+DELETE_BATCH_DELAY = 2.0  # Seconds to wait for more commands before flushing
+LOG_MESSAGE_LIMIT = 4096  # Telegram's maximum message length
+PERMISSION_CACHE_TTL = 300  # Seconds to trust a cached delete permission
+
+ERROR_REPORT_LIMIT = 5  # Errors reported per window, the rest are dropped
+ERROR_REPORT_WINDOW = 60  # Seconds
+
+_bot_id: Optional[int] = None
+_error_reports = {"window_start": 0.0, "count": 0}
+_delete_permission_cache: Dict[int, Tuple[bool, float]] = {}
+
+# Characters allowed in a command name, as in /command or /command@botname
+_COMMAND_CHARS = frozenset(string.ascii_letters + string.digits + "_")
+
+def parse_command(text: str) -> Optional[str]:
+    """Return the leading /command[@botname] token of a command to clean.
+
+    Returns None if the text is not a command or the command is whitelisted.
+    """
+    if not text or text[0] != "/":
+        return None
+    
+    length = len(text)
+    command_end = 1
+    while command_end < length and text[command_end] in _COMMAND_CHARS:
+        command_end += 1
+    if command_end == 1:
+        return None
+    
+    # Skip an optional @botname suffix
+    end = command_end
+    if end < length and text[end] == "@":
+        end += 1
+        while end < length and (text[end].isalnum() or text[end] == "_"):
+            end += 1
+        if end == command_end + 1:
+            return None
+    
+    # The command must be followed by whitespace or the end of the text
+    if end < length and not text[end].isspace():
+        return None
+    
+    if text[1:command_end].lower() in _WHITELIST:
+        return None
+    return text[:end]
 
 def is_command(text: str) -> bool:
     """Check if the given text is a command."""
-    if not text or not text.startswith('/'):
-        return False
+    return parse_command(text) is not None
+
+_pending_deletions: Dict[int, List[Tuple[Message, str]]] = defaultdict(list)
+_flush_timers: Dict[int, asyncio.TimerHandle] = {}
+_flush_tasks = set()
+
+_LOG_TEMPLATE = (
+    "🗑 **Command Deleted**\n\n"
+    "**Chat:** {chat_title} (`{chat_id}`)\n"
+    "**User:** {user_mention} (`{user_id}`)\n"
+    "**Command:** `{command}`\n"
+)
+_REPLY_TEMPLATE = "**Replied to:** [Message]({link}) by {replied_user}\n"
+_REPLIED_USER_TEMPLATE = "{mention} (`{user_id}`)"
+
+def format_command_deletion(message: Message, command: str) -> str:
+    """Build the log entry for a deleted command."""
+    chat = message.chat
+    user = message.from_user
+    reply = message.reply_to_message
     
-    # Check if it's a command by pattern matching
-    match = COMMAND_PATTERN.match(text)
-    if not match:
-        return False
+    log_text = _LOG_TEMPLATE.format_map(
+        {
+            "chat_title": chat.title or "N/A",
+            "chat_id": chat.id,
+            "user_mention": user.mention if user else "N/A",
+            "user_id": user.id if user else "N/A",
+            "command": command,
+        }
+    )
+    
+    if reply:
+        replied_user = reply.from_user
+        log_text += _REPLY_TEMPLATE.format_map(
+            {
+                "link": message.link,
+                "replied_user": _REPLIED_USER_TEMPLATE.format_map(
+                    {"mention": replied_user.mention, "user_id": replied_user.id}
+                )
+                if replied_user
+                else "Unknown user",
+            }
+        )
     
-    # Extract the command name (without the slash)
-    command = match.group(1).lower() if match.group(1) else ""
-    return command not in WHITELISTED_COMMANDS
+    return log_text
 
-async def log_command_deletion(message: Message, command: str):
-    """Log the deleted command to the log chat."""
+async def log_command_deletions(entries: List[Tuple[Message, str]]):
+    """Log a batch of deleted commands to the log chat."""
     if not LOG_COMMANDS or not LOG_CHAT_ID:
         return
 
     try:
-        chat = message.chat
-        user = message.from_user
-        
-        log_text = (
-            "🗑 **Command Deleted**\n\n"
-            f"**Chat:** {chat.title if chat.title else 'N/A'} "
-            f"(`{chat.id}`)\n"
-            f"**User:** {user.mention if user else 'N/A'} "
-            f"(`{user.id if user else 'N/A'}`)\n"
-            f"**Command:** `{command}`\n"
-        )
-        
-        if message.reply_to_message:
-            log_text += f"**Replied to:** [Message]({message.link}) by "
-            if message.reply_to_message.from_user:
-                log_text += f"{message.reply_to_message.from_user.mention} "
-                log_text += f"(`{message.reply_to_message.from_user.id}`)\n"
-            else:
-                log_text += "Unknown user\n"
-        
-        await app.send_message(
-            chat_id=LOG_CHAT_ID,
-            text=log_text,
-        )
+        chunk = ""
+        for message, command in entries:
+            entry = format_command_deletion(message, command)
+            if chunk and len(chunk) + len(entry) + 1 > LOG_MESSAGE_LIMIT:
+                await app.send_message(chat_id=LOG_CHAT_ID, text=chunk)
+                chunk = ""
+            chunk = f"{chunk}\n{entry}" if chunk else entry
+        if chunk:
+            await app.send_message(chat_id=LOG_CHAT_ID, text=chunk)
     except Exception as e:
         # Don't crash if logging fails
-        print(f"Error logging command deletion: {e}")
+        logger.error("Error logging command deletion: %s", e)
 
-print("✅ Command Cleaner module loaded successfully!")
+async def flush_deletions(chat_id: int):
+    """Delete all queued commands of a chat in a single request."""
+    timer = _flush_timers.pop(chat_id, None)
+    if timer:
+        timer.cancel()
+    entries = _pending_deletions.pop(chat_id, None)
+    if not entries:
+        return
+    
+    # Deleting and logging are independent round trips, so overlap them
+    delete_result, _ = await asyncio.gather(
+        app.delete_messages(chat_id, [message.id for message, _ in entries]),
+        log_command_deletions(entries),
+        return_exceptions=True,
+    )
+    if isinstance(delete_result, Exception):
+        logger.warning("Failed to delete messages: %s", delete_result)
+    else:
+        logger.debug("Deleted %d command(s) in chat %s", len(entries), chat_id)
+
+def _schedule_flush(chat_id: int):
+    task = asyncio.create_task(flush_deletions(chat_id))
+    _flush_tasks.add(task)
+    task.add_done_callback(_flush_tasks.discard)
+
+def queue_deletion(message: Message, command: str):
+    """Queue a command message for batched deletion."""
+    chat_id = message.chat.id
+    entries = _pending_deletions[chat_id]
+    entries.append((message, command))
+    
+    if len(entries) >= DELETE_BATCH_SIZE:
+        _schedule_flush(chat_id)
+    elif chat_id not in _flush_timers:
+        _flush_timers[chat_id] = asyncio.get_running_loop().call_later(
+            DELETE_BATCH_DELAY, _schedule_flush, chat_id
+        )
 
-@app.on_message(filters.group & ~filters.private & ~filters.service & filters.text)
+logger.info("Command Cleaner module loaded")
+
+def _should_report_error() -> bool:
+    """Allow at most ERROR_REPORT_LIMIT error reports per window."""
+    now = time.monotonic()
+    if now - _error_reports["window_start"] > ERROR_REPORT_WINDOW:
+        _error_reports["window_start"] = now
+        _error_reports["count"] = 0
+    _error_reports["count"] += 1
+    return _error_reports["count"] <= ERROR_REPORT_LIMIT
+
+async def command_prefix_filter(_, __, message: Message) -> bool:
+    text = message.text
+    return bool(text) and text[0] == "/"
+
+command_prefix = filters.create(command_prefix_filter)
+
+@app.on_message(
+    filters.group & ~filters.service & filters.text & ~filters.bot & command_prefix,
+    group=command_cleaner_group,
+)
 async def command_cleaner_handler(_, message: Message):
     """Handle command messages in groups and delete them."""
     try:
-        # Debug log
-        print(f"Processing message in chat {message.chat.id}: {message.text}")
-        
-        # Skip if the message is not a text message or is from a bot
-        if not message.text or (message.from_user and message.from_user.is_bot):
-            return
-            
         # Check if it's a command and not whitelisted
-        if not is_command(message.text):
+        command = parse_command(message.text)
+        if not command:
             return
             
-        print(f"Detected command to clean: {message.text}")
+        logger.debug("Detected command to clean in chat %s: %s", message.chat.id, message.text)
             
         # Check if we have permission to delete messages
         if not await can_delete_messages(message):
-            print("Bot doesn't have permission to delete messages")
+            logger.debug("Bot can't delete messages in chat %s", message.chat.id)
             return
             
-        try:
-            # Delete the command message
-            await message.delete()
-            print(f"Successfully deleted command: {message.text}")
-            
-            # Log the deleted command
-            await log_command_deletion(message, message.text.split()[0])
-            
-        except Exception as delete_error:
-            print(f"Failed to delete message: {delete_error}")
+        # Delete (and log) the command along with others from this chat
+        queue_deletion(message, command)
             
     except Exception as e:
         # Log any errors but don't crash the handler
-        print(f"Error in command_cleaner: {e}")
-        import traceback
-        traceback.print_exc()
+        if not _should_report_error():
+            return
+        logger.exception("Error in command_cleaner: %s", e)
         if LOG_CHAT_ID:
             try:
                 await app.send_message(LOG_CHAT_ID, str(e)[:300])
             except:
                 pass
 
+async def get_bot_id() -> int:
+    """Return the bot's user ID, fetching it only once."""
+    global _bot_id
+    if _bot_id is None:
+        _bot_id = (await app.get_me()).id
+    return _bot_id
+
 async def can_delete_messages(message: Message) -> bool:
     """Check if the bot has permission to delete messages in the chat."""
     try:
-        if not message.chat or not message.chat.type in ["group", "supergroup"]:
+        if not message.chat or message.chat.type not in (ChatType.GROUP, ChatType.SUPERGROUP):
             return False
+        
+        chat_id = message.chat.id
+        cached = _delete_permission_cache.get(chat_id)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
             
         # Check if the bot is an admin with delete permissions
-        me = await app.get_me()
-        member = await message.chat.get_member(me.id)
-        return bool(member and hasattr(member, 'can_delete_messages') and member.can_delete_messages)
+        member = await message.chat.get_member(await get_bot_id())
+        privileges = member.privileges if member else None
+        can_delete = bool(privileges and privileges.can_delete_messages)
+        _delete_permission_cache[chat_id] = (
+            can_delete,
+            time.monotonic() + PERMISSION_CACHE_TTL,
+        )
+        return can_delete
     except Exception as e:
-        print(f"Error checking delete permissions: {e}")
-        return False
-    except Exception:
+        logger.warning("Error checking delete permissions: %s", e)
         return False
 
+@app.on_chat_member_updated(filters.group, group=command_cleaner_group)
+async def invalidate_delete_permission(_, update: ChatMemberUpdated):
+    """Forget the cached permission when the bot's own membership changes."""
+    member = update.new_chat_member or update.old_chat_member
+    if member and member.user and member.user.id == await get_bot_id():
+        _delete_permission_cache.pop(update.chat.id, None)
+
 __MODULE__ = "Command Cleaner"
 __HELP__ = """
-{{ ... }}
-
 This module automatically deletes command messages in group chats to keep chats clean.
 
 **Features:**
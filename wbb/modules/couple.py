@@ -23,11 +23,11 @@ SOFTWARE.
 """
 import random
 from datetime import datetime, timedelta
+from time import time
 from typing import List, Tuple
 
 import pytz
 from pyrogram import enums, filters
-from pyrogram.types import User
 
 from wbb import app
 from wbb.core.decorators.errors import capture_err
@@ -43,26 +43,90 @@ def get_current_ist_datetime() -> datetime:
     """Get current datetime in IST timezone."""
     return datetime.now(IST)
 
+# The date strings only change at midnight IST
+date_strings_cache = {"expires_at": 0, "data": None}
+
+
 def get_date_strings() -> Tuple[str, str]:
     """
     Get today's and tomorrow's date strings in DD/MM/YYYY format.
     Handles month and year transitions.
     """
+    if time() < date_strings_cache["expires_at"]:
+        return date_strings_cache["data"]
+
     today = get_current_ist_datetime()
     tomorrow = today + timedelta(days=1)
     
     today_str = today.strftime("%d/%m/%Y")
     tomorrow_str = tomorrow.strftime("%d/%m/%Y")
     
+    midnight = IST.localize(datetime.combine(tomorrow.date(), datetime.min.time()))
+    date_strings_cache["expires_at"] = midnight.timestamp()
+    date_strings_cache["data"] = (today_str, tomorrow_str)
     return today_str, tomorrow_str
 
-async def get_member_list(chat_id: int) -> List[User]:
-    """Get a list of non-bot, non-deleted users in the chat."""
-    members = []
-    async for member in app.get_chat_members(chat_id):
-        if not member.user.is_bot and not member.user.is_deleted:
-            members.append(member.user)
-    return members
+# Walking the member list of a big group takes many requests, so the IDs
+# are kept for a while instead of whole User objects
+MEMBER_IDS_CACHE_TTL = 3600
+MEMBER_IDS_CACHE_LIMIT = 256
+member_ids_cache = {}
+
+
+async def get_member_ids(chat_id: int) -> List[int]:
+    """Get the IDs of non-bot, non-deleted users in the chat."""
+    cached = member_ids_cache.get(chat_id)
+    if cached and time() - cached["last_updated_at"] < MEMBER_IDS_CACHE_TTL:
+        return cached["data"]
+
+    member_ids = [
+        member.user.id
+        async for member in app.get_chat_members(chat_id)
+        if not member.user.is_bot and not member.user.is_deleted
+    ]
+    if len(member_ids_cache) >= MEMBER_IDS_CACHE_LIMIT:
+        member_ids_cache.clear()
+    member_ids_cache[chat_id] = {"last_updated_at": time(), "data": member_ids}
+    return member_ids
+
+# Today's couple per chat; an entry from an earlier day is simply a miss
+COUPLES_CACHE_LIMIT = 1024
+couples_cache = {}
+
+
+async def get_todays_couple(chat_id: int, today_str: str):
+    cached = couples_cache.get(chat_id)
+    if cached and cached["date"] == today_str:
+        return cached["data"]
+    couple_data = await get_couple(chat_id, today_str)
+    if couple_data:
+        _cache_couple(chat_id, today_str, couple_data)
+    return couple_data
+
+
+async def save_todays_couple(chat_id: int, today_str: str, couple_data: dict):
+    """Save today's couple, returns the one that won if another was saved
+    concurrently"""
+    couple_data = await save_couple(chat_id, today_str, couple_data)
+    _cache_couple(chat_id, today_str, couple_data)
+    return couple_data
+
+
+def _cache_couple(chat_id: int, today_str: str, couple_data: dict):
+    if len(couples_cache) >= COUPLES_CACHE_LIMIT:
+        couples_cache.clear()
+    couples_cache[chat_id] = {"date": today_str, "data": couple_data}
+
+
+async def get_couple_users(c1_id: int, c2_id: int) -> tuple:
+    """Fetch both users in one request, falling back to fetching any
+    user that the batch left out on its own"""
+    users = {user.id: user for user in await app.get_users([c1_id, c2_id])}
+    for user_id in (c1_id, c2_id):
+        if user_id not in users:
+            users[user_id] = await app.get_users(user_id)
+    return users[c1_id], users[c2_id]
+
 
 @app.on_message(filters.command("detect_gay"))
 @capture_err
@@ -77,12 +141,13 @@ async def couple(_, message):
 
     try:
         # Check if a couple was already selected today
-        existing_couple = await get_couple(chat_id, today_str)
+        existing_couple = await get_todays_couple(chat_id, today_str)
         
         if existing_couple:
             # Show existing couple
-            c1 = await app.get_users(existing_couple["c1_id"])
-            c2 = await app.get_users(existing_couple["c2_id"])
+            c1, c2 = await get_couple_users(
+                existing_couple["c1_id"], existing_couple["c2_id"]
+            )
             await status.edit(
                 f"**Couple of the day:**\n"
                 f"[{c1.first_name}](tg://user?id={c1.id}) + "
@@ -92,16 +157,20 @@ async def couple(_, message):
             return
 
         # Select new couple
-        members = await get_member_list(chat_id)
-        if len(members) < 2:
+        member_ids = await get_member_ids(chat_id)
+        if len(member_ids) < 2:
             return await status.edit("Not enough users to form a couple!")
 
         # Select two distinct random users
-        c1, c2 = random.sample(members, 2)
+        c1_id, c2_id = random.sample(member_ids, 2)
         
-        # Save the new couple
-        couple_data = {"c1_id": c1.id, "c2_id": c2.id}
-        await save_couple(chat_id, today_str, couple_data)
+        # Save the new couple, then fetch just the two users that won
+        couple_data = await save_todays_couple(
+            chat_id, today_str, {"c1_id": c1_id, "c2_id": c2_id}
+        )
+        c1, c2 = await get_couple_users(
+            couple_data["c1_id"], couple_data["c2_id"]
+        )
 
         # Send the result
         await status.edit(
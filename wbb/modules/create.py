@@ -30,17 +30,9 @@ from pyrogram.types import (
     Message,
     LinkPreviewOptions,
 )
-from wbb import BOT_USERNAME, SUDOERS, USERBOT_PREFIX, app2
+from wbb import BOT_USERNAME, SUDOERS, USERBOT_PREFIX, app2, userbot_on_message
 from wbb.modules.userbot import eor
 
-# Safe userbot decorator
-def userbot_on_message(*args, **kwargs):
-    if app2:
-        return app2.on_message(*args, **kwargs)
-    # Dummy decorator if userbot is not initialized
-    def dummy(func):
-        return func
-    return dummy
 
 @userbot_on_message(
     SUDOERS
@@ -1,6 +1,6 @@
 from pyrogram import filters
 from pyrogram.types import Message
-from wbb import SUDOERS, USERBOT_PREFIX, app, app2
+from wbb import SUDOERS, USERBOT_PREFIX, app, userbot_on_message
 
 __MODULE__ = "Dice"
 __HELP__ = """
@@ -8,14 +8,8 @@ __HELP__ = """
     Roll a dice.
 """
 
-# Safe userbot decorator
-def userbot_on_message(*args, **kwargs):
-    if app2:
-        return app2.on_message(*args, **kwargs)
-    # Dummy decorator if userbot is not initialized
-    def dummy(func):
-        return func
-    return dummy
+# Each reroll costs two API calls, so cap them
+MAX_REROLLS = 20
 
 
 @userbot_on_message(
@@ -37,6 +31,8 @@ async def throw_dice(client, message: Message):
 
     # Keep rolling until 6 if sudo
     dice_msg = await client.send_dice(chat_id, "🎲")
-    while dice_msg.dice.value != 6:
+    for _ in range(MAX_REROLLS):
+        if dice_msg.dice.value == 6:
+            break
         await dice_msg.delete()
         dice_msg = await client.send_dice(chat_id, "🎲")
@@ -978,7 +978,7 @@ async def fbroadcast_message(client, message):
     await m.edit(f"**Broadcasted Message In {sent} Chats.**")
 
 
-@app.on_callback_query(filters.regex("rmfed_(.*)"))
+@app.on_callback_query(filters.regex("^rmfed_(.*)"))
 async def del_fed_button(client, cb):
     query = cb.data
     userid = cb.message.chat.id
@@ -1000,7 +1000,7 @@ async def del_fed_button(client, cb):
             )
 
 
-@app.on_callback_query(filters.regex("trfed_(.*)"))
+@app.on_callback_query(filters.regex("^trfed_(.*)"))
 async def fedtransfer_button(client, cb):
     query = cb.data
     userid = cb.message.chat.id
@@ -1019,7 +1019,7 @@ async def fedtransfer_button(client, cb):
         )
 
 
-@app.on_callback_query(filters.regex("fed_(.*)"))
+@app.on_callback_query(filters.regex("^fed_(.*)"))
 async def fed_owner_help(client, cb):
     query = cb.data
     userid = cb.message.chat.id
@@ -148,8 +148,7 @@ async def get_filterss(_, message):
         return await message.reply_text("**No filters in this chat.**")
     _filters.sort()
     msg = f"List of filters in {message.chat.title} :\n"
-    for _filter in _filters:
-        msg += f"**-** `{_filter}`\n"
+    msg += "".join([f"**-** `{_filter}`\n" for _filter in _filters])
     await message.reply_text(msg)
 
 
@@ -291,7 +290,7 @@ async def stop_all(_, message):
         )
 
 
-@app.on_callback_query(filters.regex("stop_(.*)"))
+@app.on_callback_query(filters.regex("^stop_(.*)"))
 async def stop_all_cb(_, cb):
     chat_id = cb.message.chat.id
     from_user = cb.from_user
@@ -131,7 +131,7 @@ async def flood_control_func(_, message: Message):
     DB[chat_id][user_id] += 1
 
 
-@app.on_callback_query(filters.regex("unmute_"))
+@app.on_callback_query(filters.regex("^unmute_"))
 async def flood_callback_func(_, cq: CallbackQuery):
     from_user = cq.from_user
     permissions = await member_permissions(cq.message.chat.id, from_user.id)
@@ -316,7 +316,7 @@ async def send_welcome_message(chat: Chat, user_id: int, delete: bool = False):
     asyncio.create_task(_send_wait_delete())
 
 
-@app.on_callback_query(filters.regex("pressed_button"))
+@app.on_callback_query(filters.regex("^pressed_button "))
 async def callback_query_welcome_button(_, callback_query):
     """After the new member presses the correct button,
     set his permissions to chat permissions,
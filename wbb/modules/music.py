@@ -8,11 +8,14 @@ import datetime
 import logging
 import os
 from functools import partial
-from io import BytesIO
+from time import time
+from uuid import uuid4
 
+import aiofiles
+from aiohttp import ClientTimeout
 from pyrogram import filters
+from pyrogram.enums import ChatAction
 from pytube import YouTube
-from requests import get
 
 from wbb import aiohttpsession as session
 from wbb import app, arq, SUDOERS
@@ -43,68 +46,207 @@ Download and search for music from various sources.
 **Note:** Video duration limit is 30 minutes for YouTube downloads
 """
 
-# Use asyncio lock instead of global flag for better concurrency control
-download_lock = asyncio.Lock()
+# Downloads run in worker threads or stream on the event loop, so a few
+# can run side by side
+MAX_CONCURRENT_DOWNLOADS = 4
+download_sem = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
 MAX_DURATION = 1800  # 30 minutes in seconds
 TEMP_DIR = "downloads"
+CHUNK_SIZE = 65536
+# Song downloads can take longer than the shared session's total timeout
+STREAM_TIMEOUT = ClientTimeout(total=None, connect=10, sock_read=60)
 
 # Ensure temp directory exists
 if not os.path.exists(TEMP_DIR):
     os.makedirs(TEMP_DIR)
 
 
-def download_youtube_audio(arq_resp):
-    """Download audio from YouTube response"""
+def fetch_youtube_audio(url):
+    """
+    Download the audio stream of a YouTube video,
+    returns (path, display file name)
+    """
     try:
-        r = arq_resp.result[0]
-        title = r.title
-        performer = r.channel
+        yt = YouTube(url)
+        audio = yt.streams.filter(only_audio=True).first()
+        
+        if not audio:
+            return None
         
+        # pytube fetches in ranged requests, which googlevideo doesn't
+        # throttle. Unique on disk so concurrent downloads of one title
+        # can't collide.
+        audio_file = audio.download(
+            output_path=TEMP_DIR, filename=f"{uuid4().hex}.mp3"
+        )
+        base, _ = os.path.splitext(audio.default_filename)
+        return audio_file, base + ".mp3"
+    
+    except Exception as e:
+        logger.error(f"Error downloading YouTube audio: {e}")
+        return None
+
+
+async def download_thumbnail(url):
+    """Download a thumbnail, returns its path or None"""
+    try:
+        async with session.get(url, timeout=ClientTimeout(total=5)) as resp:
+            resp.raise_for_status()
+            thumb = await resp.read()
+        thumbnail_file = os.path.join(TEMP_DIR, f"thumb_{uuid4().hex}.png")
+        async with aiofiles.open(thumbnail_file, "wb") as f:
+            await f.write(thumb)
+        return thumbnail_file
+    except Exception as e:
+        logger.warning(f"Failed to download thumbnail: {e}")
+        return None
+
+
+async def download_youtube_audio(arq_resp):
+    """Download audio from YouTube response"""
+    r = arq_resp.result[0]
+    title = r.title
+    
+    try:
         # Parse duration safely
         m, s = r.duration.split(":")
         duration = int(datetime.timedelta(minutes=int(m), seconds=int(s)).total_seconds())
+    except Exception as e:
+        logger.error(f"Error parsing YouTube duration: {e}")
+        return None
+    
+    # Check duration limit
+    if duration > MAX_DURATION:
+        return None
+    
+    # pytube is blocking, so it runs in a thread while the thumbnail
+    # is fetched
+    loop = asyncio.get_running_loop()
+    downloaded, thumbnail_file = await asyncio.gather(
+        loop.run_in_executor(
+            None,
+            partial(fetch_youtube_audio, f"https://youtube.com{r.url_suffix}"),
+        ),
+        download_thumbnail(r.thumbnails[0]),
+    )
+    if not downloaded:
+        if thumbnail_file and os.path.exists(thumbnail_file):
+            os.remove(thumbnail_file)
+        return None
+    audio_file, file_name = downloaded
+    
+    return {
+        "title": title,
+        "performer": r.channel,
+        "duration": duration,
+        "audio_file": audio_file,
+        "file_name": file_name,
+        "thumbnail_file": thumbnail_file
+    }
+
+
+# Telegram file IDs of tracks sent recently, so repeat queries skip the
+# search, the download and the upload
+FILE_ID_CACHE_TTL = 7 * 24 * 3600
+audio_file_ids = {}
+# Lyrics replies, they don't change either
+LYRICS_CACHE_TTL = 7 * 24 * 3600
+lyrics_cache = {}
+CACHE_LIMIT = 1024
+# Queries being downloaded right now -> future of the sent file ID
+ytmusic_inflight = {}
+# (command, user) -> [window start, requests in window]
+rate_limits = {}
+RATE_LIMITS_LIMIT = 10_000
+
+
+def get_cached(cache, key, ttl):
+    cached = cache.get(key)
+    if cached and time() - cached["last_updated_at"] < ttl:
+        return cached["data"]
+    return None
+
+
+def set_cached(cache, key, data):
+    if len(cache) >= CACHE_LIMIT:
+        cache.clear()
+    cache[key] = {"last_updated_at": time(), "data": data}
+
+
+def allow(message, bucket, rate, per):
+    """Fixed-window rate limit of `rate` requests per `per` seconds"""
+    sender = message.from_user or message.sender_chat or message.chat
+    key = (bucket, sender.id)
+    now = time()
+    window = rate_limits.get(key)
+    if not window or now - window[0] >= per:
+        if len(rate_limits) >= RATE_LIMITS_LIMIT:
+            rate_limits.clear()
+        rate_limits[key] = [now, 1]
+        return True
+    window[1] += 1
+    return window[1] <= rate
+
+
+async def send_youtube_audio(message, query):
+    """Search, download and send a track, returns the sent file ID"""
+    status_msg = await message.reply_text(
+        f"🎵 Searching for: `{query}` ..."
+    )
+    
+    try:
+        # Search for the song
+        arq_resp = await arq.youtube(query)
         
-        # Check duration limit
-        if duration > MAX_DURATION:
+        if not arq_resp or not arq_resp.result:
+            await status_msg.edit_text(
+                "❌ No results found for your query."
+            )
             return None
         
-        # Download thumbnail
-        try:
-            thumb = get(r.thumbnails[0], timeout=5).content
-            thumbnail_file = os.path.join(TEMP_DIR, f"thumbnail_{title[:50]}.png")
-            with open(thumbnail_file, "wb") as f:
-                f.write(thumb)
-        except Exception as e:
-            logger.warning(f"Failed to download thumbnail: {e}")
-            thumbnail_file = None
+        await status_msg.edit_text(
+            f"⬇️ Downloading: `{arq_resp.result[0].title}` ..."
+        )
         
-        # Download from YouTube
-        url = f"https://youtube.com{r.url_suffix}"
-        yt = YouTube(url)
-        audio = yt.streams.filter(only_audio=True).first()
+        # Only the download holds a slot, uploads may overlap freely
+        async with download_sem:
+            music_data = await download_youtube_audio(arq_resp)
         
-        if not audio:
+        if not music_data:
+            await status_msg.edit_text(
+                "❌ **Error:** Video is too long (max 30 minutes allowed)"
+            )
             return None
         
-        out_file = audio.download(output_path=TEMP_DIR)
-        base, _ = os.path.splitext(out_file)
-        audio_file = base + ".mp3"
+        # Send the audio file
+        await message.reply_chat_action(ChatAction.UPLOAD_AUDIO)
+        sent = await message.reply_audio(
+            audio=music_data["audio_file"],
+            file_name=music_data["file_name"],
+            duration=music_data["duration"],
+            performer=music_data["performer"],
+            title=music_data["title"],
+            thumb=music_data["thumbnail_file"] if music_data["thumbnail_file"] else None,
+        )
+        
+        await status_msg.delete()
         
+        # Cleanup files
         try:
-            os.rename(out_file, audio_file)
-        except FileExistsError:
-            os.remove(out_file)
+            if os.path.exists(music_data["audio_file"]):
+                os.remove(music_data["audio_file"])
+            if music_data["thumbnail_file"] and os.path.exists(music_data["thumbnail_file"]):
+                os.remove(music_data["thumbnail_file"])
+        except Exception as e:
+            logger.warning(f"Failed to cleanup files: {e}")
         
-        return {
-            "title": title,
-            "performer": performer,
-            "duration": duration,
-            "audio_file": audio_file,
-            "thumbnail_file": thumbnail_file
-        }
+        return sent.audio.file_id if sent and sent.audio else None
     
     except Exception as e:
-        logger.error(f"Error downloading YouTube audio: {e}")
+        logger.error(f"Error in music download: {e}")
+        await status_msg.edit_text(
+            f"❌ **Error:** {str(e)[:100]}"
+        )
         return None
 
 
@@ -124,80 +266,58 @@ async def music(_, message):
             "❌ Usage: `/ytmusic [YouTube URL or search query]` "
         )
     
+    if not allow(message, "ytmusic", 3, 60):
+        return await message.reply_text(
+            "⏳ You're doing that too often, try again in a minute."
+        )
+    
     query = message.text.split(None, 1)[1]
+    key = f"youtube:{query.strip().lower()}"
+    
+    file_id = get_cached(audio_file_ids, key, FILE_ID_CACHE_TTL)
+    if file_id:
+        return await message.reply_audio(audio=file_id)
     
-    # Use lock to prevent multiple concurrent downloads
-    if download_lock.locked():
+    # The same query is already being downloaded, reuse its upload
+    inflight = ytmusic_inflight.get(key)
+    if inflight:
+        file_id = await asyncio.shield(inflight)
+        if file_id:
+            return await message.reply_audio(audio=file_id)
+        return await message.reply_text("❌ Failed to download this track.")
+    
+    # Limit the number of concurrent downloads
+    if download_sem.locked():
         return await message.reply_text(
-            "⏳ Another download is in progress. Please wait..."
+            "⏳ Too many downloads are in progress. Please wait..."
         )
     
-    async with download_lock:
-        status_msg = await message.reply_text(
-            f"🎵 Searching for: `{query}` ..."
-        )
-        
-        try:
-            # Search for the song
-            arq_resp = await arq.youtube(query)
-            
-            if not arq_resp or not arq_resp.result:
-                return await status_msg.edit_text(
-                    "❌ No results found for your query."
-                )
-            
-            await status_msg.edit_text(
-                f"⬇️ Downloading: `{arq_resp.result[0].title}` ..."
-            )
-            
-            # Download in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            music_data = await loop.run_in_executor(
-                None, partial(download_youtube_audio, arq_resp)
-            )
-            
-            if not music_data:
-                return await status_msg.edit_text(
-                    "❌ **Error:** Video is too long (max 30 minutes allowed)"
-                )
-            
-            # Send the audio file
-            await message.reply_audio(
-                audio=music_data["audio_file"],
-                duration=music_data["duration"],
-                performer=music_data["performer"],
-                title=music_data["title"],
-                thumb=music_data["thumbnail_file"] if music_data["thumbnail_file"] else None,
-            )
-            
-            await status_msg.delete()
-            
-            # Cleanup files
-            try:
-                if os.path.exists(music_data["audio_file"]):
-                    os.remove(music_data["audio_file"])
-                if music_data["thumbnail_file"] and os.path.exists(music_data["thumbnail_file"]):
-                    os.remove(music_data["thumbnail_file"])
-            except Exception as e:
-                logger.warning(f"Failed to cleanup files: {e}")
-        
-        except Exception as e:
-            logger.error(f"Error in music download: {e}")
-            await status_msg.edit_text(
-                f"❌ **Error:** {str(e)[:100]}"
-            )
+    future = asyncio.get_running_loop().create_future()
+    ytmusic_inflight[key] = future
+    file_id = None
+    try:
+        file_id = await send_youtube_audio(message, query)
+        if file_id:
+            set_cached(audio_file_ids, key, file_id)
+    finally:
+        del ytmusic_inflight[key]
+        future.set_result(file_id)
 
 
 async def download_song(url):
-    """Download song from URL"""
+    """Download song from URL to a temporary file, returns its path"""
+    song_file = os.path.join(TEMP_DIR, f"song_{uuid4().hex}.mp3")
     try:
-        async with session.get(url, timeout=30) as resp:
-            song = await resp.read()
-        song_bytes = BytesIO(song)
-        song_bytes.name = "song.mp3"
-        return song_bytes
+        async with session.get(url, timeout=STREAM_TIMEOUT) as resp:
+            resp.raise_for_status()
+            async with aiofiles.open(song_file, "wb") as f:
+                async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                    await f.write(chunk)
+        return song_file
     except Exception as e:
         logger.error(f"Error downloading song: {e}")
+        if os.path.exists(song_file):
+            os.remove(song_file)
         return None
 
 
@@ -211,9 +331,21 @@ async def saavn_music(_, message):
             "❌ Usage: `/saavn [song name]` "
         )
     
+    if not allow(message, "saavn", 5, 60):
+        return await message.reply_text(
+            "⏳ You're doing that too often, try again in a minute."
+        )
+    
     query = message.text.split(None, 1)[1]
+    key = f"saavn:{query.strip().lower()}"
+    
+    file_id = get_cached(audio_file_ids, key, FILE_ID_CACHE_TTL)
+    if file_id:
+        return await message.reply_audio(audio=file_id)
+    
     m = await message.reply_text("🔍 Searching on Saavn...")
     
+    song_file = None
     try:
         resp = await arq.saavn(query)
         
@@ -235,17 +367,24 @@ async def saavn_music(_, message):
         if not song_file:
             return await m.edit("❌ Failed to download the song.")
         
-        await message.reply_audio(
+        sent = await message.reply_audio(
             audio=song_file,
+            file_name="song.mp3",
             title=song_name,
             performer=artist
         )
+        if sent and sent.audio:
+            set_cached(audio_file_ids, key, sent.audio.file_id)
         
         await m.delete()
     
     except Exception as e:
         logger.error(f"Error in Saavn: {e}")
         await m.edit(f"❌ **Error:** {str(e)[:100]}")
+    
+    finally:
+        if song_file and os.path.exists(song_file):
+            os.remove(song_file)
 
 
 @app.on_message(filters.command("lyrics"))
@@ -258,7 +397,18 @@ async def lyrics_func(_, message):
             "❌ Usage: `/lyrics [song name]` "
         )
     
+    if not allow(message, "lyrics", 10, 60):
+        return await message.reply_text(
+            "⏳ You're doing that too often, try again in a minute."
+        )
+    
     query = message.text.strip().split(None, 1)[1]
+    key = query.strip().lower()
+    
+    msg = get_cached(lyrics_cache, key, LYRICS_CACHE_TTL)
+    if msg:
+        return await message.reply_text(msg)
+    
     m = await message.reply_text("🔍 Searching for lyrics...")
     
     try:
@@ -276,6 +426,7 @@ async def lyrics_func(_, message):
         msg = f"🎵 **{song_name}** | **{artist}**\n\n{lyrics}"
         
         # If too long, use pastebin
+        cacheable = True
         if len(msg) > 4095:
             try:
                 paste_url = await paste(msg)
@@ -283,7 +434,10 @@ async def lyrics_func(_, message):
             except Exception as e:
                 logger.error(f"Pastebin error: {e}")
                 msg = f"🎵 **{song_name}** | **{artist}**\n\n⚠️ Lyrics too long to display"
+                cacheable = False
         
+        if cacheable:
+            set_cached(lyrics_cache, key, msg)
         await m.edit(msg)
     
     except Exception as e:
@@ -154,7 +154,7 @@ async def unblock_user_func(_, message):
 flood2 = {}
 
 
-@app.on_callback_query(filters.regex("pmpermit"))
+@app.on_callback_query(filters.regex("^pmpermit "))
 async def pmpermit_cq(_, cq):
     user_id = cq.from_user.id
     data, victim = (
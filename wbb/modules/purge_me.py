@@ -22,6 +22,8 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import asyncio
+
 from pyrogram import filters
 from pyrogram.types import Message
 
@@ -79,14 +81,25 @@ TEXT = """
 
 <code>dice</code> → Roll a dice.<br>
 """
-log.info("Pasting userbot commands on telegraph")
+__HELP__ = f"**Commands:** Send `{USERBOT_PREFIX}help` from the userbot."
+
+# Telegraph page with the userbot commands, pasted on first use
+HELP_URL = None
 
-__HELP__ = f"""**Commands:** {telegraph.create_page(
-    "Userbot Commands",
-    html_content=TEXT,
-)['url']}"""
 
-log.info("Done pasting userbot commands on telegraph")
+async def get_help_url() -> str:
+    global HELP_URL
+    if HELP_URL is None:
+        log.info("Pasting userbot commands on telegraph")
+        loop = asyncio.get_running_loop()
+        # Attribute access may create the account too, keep it off the loop
+        page = await loop.run_in_executor(
+            None,
+            lambda: telegraph.create_page("Userbot Commands", html_content=TEXT),
+        )
+        HELP_URL = page["url"]
+        log.info("Done pasting userbot commands on telegraph")
+    return HELP_URL
 
 
 @app2.on_message(
@@ -96,9 +109,14 @@ log.info("Done pasting userbot commands on telegraph")
     & filters.user(USERBOT_ID)
 )
 async def get_help(_, message: Message):
+    try:
+        url = await get_help_url()
+    except Exception as e:
+        log.error("Failed to paste userbot commands: %s", e)
+        return await eor(message, text="Couldn't paste the commands, try again later.")
     await eor(
         message,
-        text=__HELP__,
+        text=f"**Commands:** {url}",
         disable_web_page_preview=True,
     )
 
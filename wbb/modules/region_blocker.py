@@ -4,13 +4,18 @@ Helps prevent spam, bot attacks, and DDoS-like behavior
 Admins can block specific countries and language scripts
 """
 
+import asyncio
 from pyrogram import filters, Client
+from pyrogram.enums import ChatMemberStatus
 from pyrogram.types import Message, ChatMember
-from wbb import app, SUDOERS
+from wbb import app, db, SUDOERS
+from wbb.utils.filter_groups import region_blocker_group
+from wbb.utils.permissions_utils import has_permission
 import logging
 from motor.motor_asyncio import AsyncIOMotorCollection
-from wbb.core.mongo import db
 import re
+from dataclasses import dataclass
+from time import time
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +69,7 @@ LANGUAGE_SCRIPTS = {
         "description": "Cyrillic (Russian, Ukrainian, Serbian, Bulgarian)"
     },
     "arabic": {
-        "pattern": r"[\u0600-\u06FF\u0750-\u077F]",
+        "pattern": r"[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]",
         "description": "Arabic"
     },
     "hebrew": {
@@ -76,7 +81,7 @@ LANGUAGE_SCRIPTS = {
         "description": "Hindi/Devanagari (Hindi, Marathi, Sanskrit)"
     },
     "chinese": {
-        "pattern": r"[\u4E00-\u9FFF\u3400-\u4DBF\uF900-\uFAFF]",
+        "pattern": r"[\u4E00-\u9FFF\u3400-\u4DBF\uF900-\uFAFF\U00020000-\U0002EBEF\U00030000-\U0003134F]",
         "description": "Chinese (Simplified and Traditional)"
     },
     "thai": {
@@ -84,11 +89,12 @@ LANGUAGE_SCRIPTS = {
         "description": "Thai"
     },
     "korean": {
-        "pattern": r"[\uAC00-\uD7AF\u1100-\u11FF]",
+        "pattern": r"[\uAC00-\uD7AF\u1100-\u11FF\u3130-\u318F]",
         "description": "Korean (Hangul)"
     },
     "persian": {
-        "pattern": r"[\u0600-\u06FF]",
+        # Letters Persian adds to the Arabic alphabet (pe, che, zhe, gaf)
+        "pattern": r"[\u067E\u0686\u0698\u06AF]",
         "description": "Persian/Farsi"
     },
     "georgian": {
@@ -101,6 +107,17 @@ LANGUAGE_SCRIPTS = {
     }
 }
 
+# All scripts in one pattern, so a name is scanned once instead of once per
+# script. Persian letters are part of the Arabic block, so they are tried
+# first and a Persian hit also counts as Arabic.
+SCRIPTS_PATTERN = re.compile(
+    "|".join([
+        f"(?P<{name}>{LANGUAGE_SCRIPTS[name]['pattern']})"
+        for name in sorted(LANGUAGE_SCRIPTS, key=lambda name: name != "persian")
+    ])
+)
+IMPLIED_SCRIPTS = {"persian": ("persian", "arabic")}
+
 # Country code mapping
 COUNTRY_CODES = {
     "india": ["IN", "भ", "India"],
@@ -136,9 +153,103 @@ COUNTRY_CODES = {
 }
 
 
+COUNTRY_CODES_LOWER = {
+    country: [code.lower() for code in codes]
+    for country, codes in COUNTRY_CODES.items()
+}
+
+
+def _build_country_matcher():
+    """Compile every country code into one overlapping-match pattern"""
+    code_countries = {}
+    for country, codes in COUNTRY_CODES_LOWER.items():
+        for code in codes:
+            code_countries.setdefault(code, set()).add(country)
+    # Only the longest code matches at each position, so it also stands
+    # for the codes it starts with ("my" inside "myanmar")
+    credited = {
+        code: frozenset().union(
+            *(countries for prefix, countries in code_countries.items()
+              if code.startswith(prefix))
+        )
+        for code in code_countries
+    }
+    pattern = re.compile(
+        "(?=("
+        + "|".join([
+            re.escape(code) for code in sorted(credited, key=len, reverse=True)
+        ])
+        + "))"
+    )
+    return pattern, credited
+
+
+COUNTRY_CODES_PATTERN, CODE_COUNTRIES = _build_country_matcher()
+
+# Country-to-script mapping
+COUNTRY_SCRIPTS = {
+    "india": ["hindi"],
+    "china": ["chinese"],
+    "russia": ["cyrillic"],
+    "ukraine": ["cyrillic"],
+    "belarus": ["cyrillic"],
+    "iran": ["persian", "arabic"],
+    "iraq": ["arabic"],
+    "egypt": ["arabic"],
+    "saudi_arabia": ["arabic"],
+    "uae": ["arabic"],
+    "lebanon": ["arabic"],
+    "yemen": ["arabic"],
+    "syria": ["arabic"],
+    "thailand": ["thai"],
+    "korea": ["korean"],
+    "south_korea": ["korean"],
+    "georgia": ["georgian"],
+    "mongolia": ["mongolian"],
+}
+
+
+# Countries each script points to, only for countries with known codes
+SCRIPT_COUNTRIES = {
+    script: frozenset(
+        country
+        for country, scripts in COUNTRY_SCRIPTS.items()
+        if script in scripts and country in COUNTRY_CODES
+    )
+    for script in LANGUAGE_SCRIPTS
+}
+SCRIPT_COUNTRIES_ANY = frozenset().union(*SCRIPT_COUNTRIES.values())
+
+
+@dataclass(slots=True, frozen=True)
+class Blocks:
+    """Blocked countries and language scripts of a chat"""
+    countries: frozenset = frozenset()
+    languages: frozenset = frozenset()
+
+
 class RegionBlockerDB:
+    # Blocks are read on every join, but only change through the commands
+    # below, which drop the chat's cached entry
+    CACHE_TTL = 60
+    CACHE_LIMIT = 10_000
+
     def __init__(self):
-        self.col: AsyncMotorCollection = db.region_blocker
+        self.col: AsyncIOMotorCollection = db.region_blocker
+        self._cache = {}
+        # IDs of chats with a blocks document, loaded on first use
+        self._active_chats = set()
+        self._active_loaded = False
+
+    def _invalidate(self, chat_id: int):
+        self._cache.pop(chat_id, None)
+
+    async def has_blocks(self, chat_id: int) -> bool:
+        """Whether blocks were ever configured for chat"""
+        if not self._active_loaded:
+            self._active_chats.update(await self.col.distinct("_id"))
+            self._active_loaded = True
+        return chat_id in self._active_chats
 
     async def add_blocked_country(self, chat_id: int, countries: list):
         """Add blocked countries to chat"""
@@ -152,6 +263,8 @@ class RegionBlockerDB:
             },
             upsert=True,
         )
+        self._invalidate(chat_id)
+        self._active_chats.add(chat_id)
 
     async def add_blocked_lang(self, chat_id: int, languages: list):
         """Add blocked language scripts to chat"""
@@ -165,6 +278,8 @@ class RegionBlockerDB:
             },
             upsert=True,
         )
+        self._invalidate(chat_id)
+        self._active_chats.add(chat_id)
 
     async def remove_blocked_country(self, chat_id: int, countries: list):
         """Remove blocked countries from chat"""
@@ -177,6 +292,7 @@ class RegionBlockerDB:
                 }
             },
         )
+        self._invalidate(chat_id)
 
     async def remove_blocked_lang(self, chat_id: int, languages: list):
         """Remove blocked languages from chat"""
@@ -189,18 +305,32 @@ class RegionBlockerDB:
                 }
             },
         )
+        self._invalidate(chat_id)
 
-    async def get_chat_blocks(self, chat_id: int):
+    async def get_chat_blocks(self, chat_id: int) -> Blocks:
         """Get blocked countries and languages for chat"""
-        data = await self.col.find_one({"_id": chat_id})
-        return {
-            "countries": data.get("blocked_countries", []) if data else [],
-            "languages": data.get("blocked_languages", []) if data else []
-        }
+        cached = self._cache.get(chat_id)
+        if cached and time() - cached["last_updated_at"] < self.CACHE_TTL:
+            return cached["data"]
+
+        data = await self.col.find_one(
+            {"_id": chat_id},
+            {"blocked_countries": 1, "blocked_languages": 1},
+        )
+        blocks = Blocks(
+            frozenset(data.get("blocked_countries", ())),
+            frozenset(data.get("blocked_languages", ())),
+        ) if data else Blocks()
+        if len(self._cache) >= self.CACHE_LIMIT:
+            self._cache.clear()
+        self._cache[chat_id] = {"last_updated_at": time(), "data": blocks}
+        return blocks
 
     async def clear_blocks(self, chat_id: int):
         """Clear all blocks for chat"""
         await self.col.delete_one({"_id": chat_id})
+        self._invalidate(chat_id)
+        self._active_chats.discard(chat_id)
 
 
 blocker_db = RegionBlockerDB()
@@ -211,24 +341,106 @@ async def is_admin_or_sudo(client: Client, user_id: int, chat_id: int) -> bool:
     if user_id in SUDOERS:
         return True
     
-    try:
-        member = await client.get_chat_member(chat_id, user_id)
-        return member.privileges and member.privileges.can_delete_messages
-    except:
-        return False
+    # Shared short-lived cache, refreshed on chat member updates
+    return await has_permission(chat_id, user_id, "can_delete_messages")
 
 
 def detect_language_script(text: str) -> list:
     """Detect language scripts in text"""
-    detected = []
-    if not text:
-        return detected
+    # None of the scripts has ASCII characters, which most names are
+    if not text or text.isascii():
+        return []
+    
+    found = set()
+    for match in SCRIPTS_PATTERN.finditer(text):
+        found.update(IMPLIED_SCRIPTS.get(match.lastgroup, (match.lastgroup,)))
     
-    for lang_name, lang_data in LANGUAGE_SCRIPTS.items():
-        if re.search(lang_data["pattern"], text):
-            detected.append(lang_name)
+    return [lang_name for lang_name in LANGUAGE_SCRIPTS if lang_name in found]
+
+
+# Fused patterns of only the scripts a chat blocks, keyed by that set
+BLOCKED_SCRIPTS_PATTERNS = {}
+BLOCKED_SCRIPTS_PATTERNS_LIMIT = 256
+
+
+def find_blocked_script(text: str, blocked: frozenset) -> str:
+    """Return the first blocked language script found in text"""
+    if not text or text.isascii():
+        return None
+    
+    pattern = BLOCKED_SCRIPTS_PATTERNS.get(blocked)
+    if pattern is None:
+        names = [
+            name
+            for name in sorted(LANGUAGE_SCRIPTS, key=lambda name: name != "persian")
+            if name in blocked
+        ]
+        if not names:
+            return None
+        pattern = re.compile(
+            "|".join([
+                f"(?P<{name}>{LANGUAGE_SCRIPTS[name]['pattern']})"
+                for name in names
+            ])
+        )
+        if len(BLOCKED_SCRIPTS_PATTERNS) >= BLOCKED_SCRIPTS_PATTERNS_LIMIT:
+            BLOCKED_SCRIPTS_PATTERNS.clear()
+        BLOCKED_SCRIPTS_PATTERNS[blocked] = pattern
     
-    return detected
+    match = pattern.search(text)
+    return match.lastgroup if match else None
+
+
+def user_search_text(user) -> str:
+    """Names and username of a user, used for region checks"""
+    return " ".join(
+        filter(None, (user.first_name, user.last_name, user.username))
+    )
+
+
+def match_countries(search_text: str) -> set:
+    """Countries whose codes appear anywhere in the (lowercased) text"""
+    countries = set()
+    for match in COUNTRY_CODES_PATTERN.finditer(search_text):
+        countries.update(CODE_COUNTRIES[match.group(1)])
+    return countries
+
+
+def find_blocked_country(search_text: str, blocked_countries) -> str:
+    """
+    Return a blocked country the user likely comes from, based
+    on country codes and language scripts in their names/username.
+    """
+    # Codes are matched lowercased, scripts on the raw text since
+    # lowercasing can move letters out of their script's range
+    blocked = match_countries(search_text.lower()).intersection(
+        blocked_countries
+    )
+    if not blocked and SCRIPT_COUNTRIES_ANY.intersection(blocked_countries):
+        for script in detect_language_script(search_text):
+            blocked.update(
+                SCRIPT_COUNTRIES.get(script, frozenset()).intersection(
+                    blocked_countries
+                )
+            )
+    return min(blocked) if blocked else None
+
+
+def evaluate_user(user, blocks: Blocks) -> tuple:
+    """
+    Check a user's names/username against a chat's blocks,
+    returns (blocked language, blocked country)
+    """
+    search_text = user_search_text(user)
+    
+    if blocks.languages:
+        blocked_lang = find_blocked_script(search_text, blocks.languages)
+        if blocked_lang:
+            return blocked_lang, None
+    
+    if blocks.countries:
+        return None, find_blocked_country(search_text, blocks.countries)
+    return None, None
 
 
 def is_likely_from_country(user: ChatMember, country: str) -> bool:
@@ -238,56 +450,8 @@ def is_likely_from_country(user: ChatMember, country: str) -> bool:
     - Username patterns
     """
     country = country.lower().strip()
-    
-    if country not in COUNTRY_CODES:
-        return False
-    
-    codes = COUNTRY_CODES[country]
-    
-    # Build searchable text from user data
-    search_text = ""
-    if user.user.first_name:
-        search_text += user.user.first_name.lower()
-    if user.user.last_name:
-        search_text += " " + user.user.last_name.lower()
-    if user.user.username:
-        search_text += " " + user.user.username.lower()
-    
-    # Check for language scripts in names
-    scripts = detect_language_script(search_text)
-    
-    # Country-to-script mapping
-    country_scripts = {
-        "india": ["hindi"],
-        "china": ["chinese"],
-        "russia": ["cyrillic"],
-        "ukraine": ["cyrillic"],
-        "belarus": ["cyrillic"],
-        "iran": ["persian", "arabic"],
-        "iraq": ["arabic"],
-        "egypt": ["arabic"],
-        "saudi_arabia": ["arabic"],
-        "uae": ["arabic"],
-        "lebanon": ["arabic"],
-        "yemen": ["arabic"],
-        "syria": ["arabic"],
-        "thailand": ["thai"],
-        "korea": ["korean"],
-        "south_korea": ["korean"],
-        "georgia": ["georgian"],
-        "mongolia": ["mongolian"],
-    }
-    
-    expected_scripts = country_scripts.get(country, [])
-    if expected_scripts and any(s in scripts for s in expected_scripts):
-        return True
-    
-    # Check country codes in text
-    for code in codes:
-        if code.lower() in search_text:
-            return True
-    
-    return False
+    search_text = user_search_text(user.user)
+    return find_blocked_country(search_text, (country,)) is not None
 
 
 @app.on_message(filters.command("block"))
@@ -422,13 +586,13 @@ async def show_blocklist(client: Client, message: Message):
     
     text = "🛡️ **Block List for this Chat:**\n\n"
     
-    if blocks["countries"]:
-        text += f"🚫 **Blocked Countries:** {', '.join(blocks['countries'])}\n\n"
+    if blocks.countries:
+        text += f"🚫 **Blocked Countries:** {', '.join(sorted(blocks.countries))}\n\n"
     else:
         text += "🚫 **Blocked Countries:** None\n\n"
     
-    if blocks["languages"]:
-        text += f"📝 **Blocked Language Scripts:** {', '.join(blocks['languages'])}\n"
+    if blocks.languages:
+        text += f"📝 **Blocked Language Scripts:** {', '.join(sorted(blocks.languages))}\n"
     else:
         text += "📝 **Blocked Language Scripts:** None\n"
     
@@ -448,65 +612,60 @@ async def clear_blocklist(client: Client, message: Message):
     await message.reply_text("✅ All blocks cleared for this chat!")
 
 
-@app.on_chat_member_updated()
+# Pending removal notices, kept referenced until they finish
+_notice_tasks = set()
+
+
+async def send_removal_notice(client: Client, chat_id: int, notice: str):
+    try:
+        await client.send_message(chat_id, notice)
+    except Exception as e:
+        logger.error(f"Error sending removal notice: {e}")
+
+
+@app.on_chat_member_updated(filters.group, group=region_blocker_group)
 async def check_new_member(client: Client, update):
     """Check new members against blocklist"""
     
     # Only check new members
-    if update.new_chat_member.status == "member" and \
-       (not hasattr(update.old_chat_member, 'status') or 
-        update.old_chat_member.status not in ["member", "restricted"]):
-        
-        chat_id = update.chat.id
-        user = update.new_chat_member.user
-        
-        # Get blocklist for this chat
-        blocks = await blocker_db.get_chat_blocks(chat_id)
-        
-        # Check language scripts in username/names
-        if blocks["languages"]:
-            search_text = ""
-            if user.first_name:
-                search_text += user.first_name
-            if user.last_name:
-                search_text += " " + user.last_name
-            if user.username:
-                search_text += " " + user.username
-            
-            detected_scripts = detect_language_script(search_text)
-            
-            for blocked_lang in blocks["languages"]:
-                if blocked_lang in detected_scripts:
-                    try:
-                        await client.ban_chat_member(chat_id, user.id)
-                        logger.info(
-                            f"Kicked {user.id} from {chat_id} - "
-                            f"Blocked language script: {blocked_lang}"
-                        )
-                        await client.send_message(
-                            chat_id,
-                            f"🛡️ Removed user with blocked language script ({blocked_lang})"
-                        )
-                    except Exception as e:
-                        logger.error(f"Error kicking user: {e}")
-                    return
-        
-        # Check country indicators
-        if blocks["countries"]:
-            member = await client.get_chat_member(chat_id, user.id)
-            
-            for blocked_country in blocks["countries"]:
-                if is_likely_from_country(member, blocked_country):
-                    try:
-                        await client.ban_chat_member(chat_id, user.id)
-                        logger.info(
-                            f"Kicked {user.id} from {chat_id} - "
-                            f"Blocked country: {blocked_country}"
-                        )
-                        await client.send_message(
-                            chat_id,
-                            f"🛡️ Removed user from blocked region ({blocked_country})"
-                        )
-                    except Exception as e:
-                        logger.error(f"Error kicking user: {e}")
-                    return
+    new_member = update.new_chat_member
+    old_member = update.old_chat_member
+    if not new_member or new_member.status != ChatMemberStatus.MEMBER:
+        return
+    if old_member and old_member.status in (
+        ChatMemberStatus.MEMBER, ChatMemberStatus.RESTRICTED
+    ):
+        return
+    
+    chat_id = update.chat.id
+    
+    # Most chats never configure blocks, skip them without a query
+    if not await blocker_db.has_blocks(chat_id):
+        return
+    
+    user = new_member.user
+    
+    # Get blocklist for this chat
+    blocks = await blocker_db.get_chat_blocks(chat_id)
+    
+    blocked_lang, blocked_country = evaluate_user(user, blocks)
+    if blocked_lang:
+        reason = f"Blocked language script: {blocked_lang}"
+        notice = f"🛡️ Removed user with blocked language script ({blocked_lang})"
+    elif blocked_country:
+        reason = f"Blocked country: {blocked_country}"
+        notice = f"🛡️ Removed user from blocked region ({blocked_country})"
+    else:
+        return
+    
+    try:
+        await client.ban_chat_member(chat_id, user.id)
+    except Exception as e:
+        logger.error(f"Error kicking user: {e}")
+        return
+    logger.info(f"Kicked {user.id} from {chat_id} - {reason}")
+    
+    # The notice doesn't need to hold up the next update
+    task = asyncio.create_task(send_removal_notice(client, chat_id, notice))
+    _notice_tasks.add(task)
+    task.add_done_callback(_notice_tasks.discard)
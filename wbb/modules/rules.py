@@ -122,7 +122,7 @@ async def delete_rules_cmd(_, message):
         )
 
 
-@app.on_callback_query(filters.regex("drules_(.*)"))
+@app.on_callback_query(filters.regex("^drules_(.*)"))
 async def delete_rules_cb(_, cb):
     chat_id = cb.message.chat.id
     from_user = cb.from_user
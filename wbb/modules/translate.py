@@ -5,25 +5,29 @@ Usage: Reply to a message with /translate [lang_code]
 Example: /translate en
 """
 
+import asyncio
+import hashlib
+import logging
 import os
-import requests
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-from deep_translator import GoogleTranslator
+
+logger = logging.getLogger(__name__)
 
 try:
-    from wbb import app, DEEPL_API, LOG_GROUP_ID
+    from wbb import aiohttpsession, app, DEEPL_API, LOG_GROUP_ID
     from wbb.utils import capture_err
     
-    # DeepL supported languages
-    DEEPL_LANGS = [
+    # DeepL supported languages, in display order
+    DEEPL_LANGS_DISPLAY = (
         "BG", "CS", "DA", "DE", "EL", "EN", "ES", "ET", "FI", "FR",
         "HU", "ID", "IT", "JA", "LT", "LV", "NL", "PL", "PT", "RO",
         "RU", "SK", "SL", "SV", "TR", "ZH"
-    ]
+    )
+    DEEPL_LANGS = frozenset(DEEPL_LANGS_DISPLAY)
     
-    # Google Translate supported languages
-    GOOGLE_LANGS = [
+    # Google Translate supported languages, in display order
+    GOOGLE_LANGS_DISPLAY = (
         "af", "sq", "am", "ar", "hy", "az", "eu", "be", "bn", "bs", "bg", "ca",
         "ceb", "zh", "zh-TW", "co", "hr", "cs", "da", "nl", "en", "eo", "et",
         "fi", "fr", "fy", "gl", "ka", "de", "el", "gu", "ht", "ha", "haw", "he",
@@ -34,7 +38,13 @@ try:
         "si", "sk", "sl", "so", "es", "su", "sw", "sv", "tl", "tg", "ta", "tt",
         "te", "th", "tr", "tk", "uk", "ur", "ug", "uz", "vi", "cy", "xh", "yi",
         "yo", "zu"
-    ]
+    )
+    GOOGLE_LANGS = frozenset(GOOGLE_LANGS_DISPLAY)
+    
+    # Lowercased codes supported by either service
+    SUPPORTED_LANGS = frozenset(
+        lang.lower() for lang in (*GOOGLE_LANGS, *DEEPL_LANGS)
+    )
     
     # Language code to name mapping
     LANG_NAMES = {
@@ -86,19 +96,94 @@ Translate text using DeepL API (if configured) or Google Translate.
 **Note:** If DeepL API key is configured, it will be used for higher quality translations. Otherwise, it will fall back to Google Translate.
 """
     
-    def detect_language(text):
+    # Both services are called over the shared aiohttp session
+    GOOGLE_API_URL = "https://translate.googleapis.com/translate_a/single"
+    DEEPL_API_URL = (
+        "https://api-free.deepl.com/v2/translate"
+        if DEEPL_API and DEEPL_API.endswith(":fx")
+        else "https://api.deepl.com/v2/translate"
+    )
+    
+    # Chunks of long texts are translated concurrently
+    MAX_CHUNK_SIZE = 5000
+    translate_sem = asyncio.Semaphore(4)
+    
+    async def google_translate(text, target, source='auto'):
+        """
+        Translate text with Google's public endpoint,
+        returns (translation, detected source language)
+        """
+        async with translate_sem:
+            async with aiohttpsession.post(
+                GOOGLE_API_URL,
+                params={"client": "gtx", "sl": source, "tl": target, "dt": "t"},
+                data={"q": text},
+            ) as resp:
+                resp.raise_for_status()
+                data = await resp.json(content_type=None)
+        
+        translated = "".join([part[0] for part in data[0] or () if part[0]])
+        return translated, data[2]
+    
+    async def deepl_translate(text, target, source=None):
+        """Translate text with DeepL"""
+        form = {"text": text, "target_lang": target}
+        if source:
+            form["source_lang"] = source
+        async with translate_sem:
+            async with aiohttpsession.post(
+                DEEPL_API_URL,
+                headers={"Authorization": f"DeepL-Auth-Key {DEEPL_API}"},
+                data=form,
+            ) as resp:
+                resp.raise_for_status()
+                data = await resp.json()
+        return data["translations"][0]["text"]
+    
+    # Detected languages keyed by a digest of the text's beginning
+    DETECT_SAMPLE_SIZE = 512
+    DETECT_CACHE_LIMIT = 2048
+    detected_languages = {}
+    
+    async def detect_language(text):
         """Detect language of the text"""
         try:
-            # GoogleTranslator.detect() returns a string like 'en', 'fr', etc.
-            return GoogleTranslator(source='auto', target='en').detect(text)
+            # Google reports the source language of an auto translation,
+            # a string like 'en', 'fr', etc.
+            _, detected = await google_translate(
+                text[:DETECT_SAMPLE_SIZE], 'en'
+            )
+            return detected
         except Exception as e:
-            print(f"Language detection error: {e}")
+            logger.warning("Language detection error: %s", e)
+            return None
+    
+    async def detect_language_cached(text):
+        """
+        detect_language(), remembering results.
+        Short ASCII text is left to the translator's own auto-detection.
+        """
+        if len(text) < 40 and text.isascii():
             return None
+        
+        key = hashlib.blake2b(
+            text[:DETECT_SAMPLE_SIZE].encode(), digest_size=8
+        ).digest()
+        if key in detected_languages:
+            return detected_languages[key]
+        
+        detected = await detect_language(text)
+        if detected:
+            if len(detected_languages) >= DETECT_CACHE_LIMIT:
+                detected_languages.clear()
+            detected_languages[key] = detected
+        return detected
     
-    def translate_text(text, target_lang, source_lang='auto'):
+    async def translate_text(text, target_lang, source_lang='auto'):
         """Translate text using DeepL or fallback to Google Translate"""
-        print(f"[DEBUG] translate_text - Source: {source_lang}, Target: {target_lang}")
-        print(f"[DEBUG] Text length: {len(text)} chars")
+        logger.debug(
+            "translate_text %s -> %s, %d chars", source_lang, target_lang, len(text)
+        )
         
         # Normalize language codes
         target_lang = target_lang.lower()
@@ -112,69 +197,48 @@ Translate text using DeepL API (if configured) or Google Translate.
         # Try DeepL first if API key is available and target language is supported
         if DEEPL_API and target_lang.upper() in DEEPL_LANGS:
             try:
-                import deepl
-                translator = deepl.Translator(DEEPL_API)
-                
                 # Convert to DeepL format (uppercase, 2-letter code)
                 deepl_target = target_lang[:2].upper()
                 
                 # For DeepL, source can be None for auto-detection
                 deepl_source = source_lang[:2].upper() if source_lang != 'auto' else None
                 
-                print(f"[DEBUG] Using DeepL: {deepl_source} -> {deepl_target}")
+                logger.debug("Using DeepL: %s -> %s", deepl_source, deepl_target)
                 
-                if deepl_source:
-                    result = translator.translate_text(
-                        text,
-                        source_lang=deepl_source,
-                        target_lang=deepl_target
-                    )
-                else:
-                    result = translator.translate_text(
-                        text,
-                        target_lang=deepl_target
-                    )
+                result = await deepl_translate(text, deepl_target, deepl_source)
                 
-                print(f"[DEBUG] DeepL translation successful")
-                return result.text, "DeepL"
+                return result, "DeepL"
                 
             except Exception as e:
-                print(f"[ERROR] DeepL translation failed: {str(e)}")
+                logger.error("DeepL translation failed: %s", e)
                 # Fall through to Google Translate
         
         # Fallback to Google Translate
         try:
-            print(f"[DEBUG] Using Google Translate: {source_lang} -> {target_lang}")
+            logger.debug("Using Google Translate: %s -> %s", source_lang, target_lang)
             
             # Google expects source='auto' for auto-detection
             google_source = 'auto' if source_lang == 'auto' else source_lang
             
-            translator = GoogleTranslator(
-                source=google_source,
-                target=target_lang
-            )
-            
             # Split long text to avoid hitting API limits
-            max_chunk_size = 5000
-            if len(text) > max_chunk_size:
-                chunks = [text[i:i+max_chunk_size] for i in range(0, len(text), max_chunk_size)]
-                translated_chunks = []
-                for chunk in chunks:
-                    translated = translator.translate(chunk)
-                    if translated is None:
-                        raise Exception("Translation returned None")
-                    translated_chunks.append(translated)
-                translated = ' '.join(translated_chunks)
-            else:
-                translated = translator.translate(text)
-                if translated is None:
-                    raise Exception("Translation returned None")
+            chunks = [
+                text[i:i + MAX_CHUNK_SIZE]
+                for i in range(0, len(text), MAX_CHUNK_SIZE)
+            ]
+            results = await asyncio.gather(
+                *(
+                    google_translate(chunk, target_lang, google_source)
+                    for chunk in chunks
+                )
+            )
+            translated = ' '.join([result for result, _ in results])
+            if not translated:
+                raise Exception("Translation returned None")
             
-            print("[DEBUG] Google Translate successful")
             return translated, "Google"
             
         except Exception as e:
-            print(f"[ERROR] Google Translate failed: {str(e)}")
+            logger.error("Google Translate failed: %s", e)
             return None, None
     
     @app.on_message(filters.command("translate") & ~filters.private)
@@ -302,29 +366,34 @@ Translate text using DeepL API (if configured) or Google Translate.
         
         # Normalize target language for checking
         check_lang = target_lang.lower()
-        # Check if language is supported by either service
-        if (check_lang not in GOOGLE_LANGS and 
-            check_lang.upper() not in DEEPL_LANGS):
-            # Also check without region code
-            base_lang = check_lang.split('-')[0]
-            if base_lang not in GOOGLE_LANGS and base_lang.upper() not in DEEPL_LANGS:
-                await message.reply_text(
-                    "Unsupported language code. Use /langs to see available languages."
-                )
-                return
+        # Check if language is supported by either service, also
+        # without region code
+        if (check_lang not in SUPPORTED_LANGS and
+                check_lang.split('-')[0] not in SUPPORTED_LANGS):
+            await message.reply_text(
+                "Unsupported language code. Use /langs to see available languages."
+            )
+            return
         
         text = message.reply_to_message.text
         
         # Detect source language if not specified
-        detected = detect_language(text)
+        detected = await detect_language_cached(text)
         source_lang = detected if detected else 'auto'
         
-        print(f"[DEBUG] Detected language: {source_lang}")
-        print(f"[DEBUG] Target language: {target_lang}")
-        print(f"[DEBUG] Text sample: {text[:100]}..." if len(text) > 100 else f"[DEBUG] Text: {text}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Detected language: %s, target language: %s, text: %r",
+                source_lang, target_lang, text[:100],
+            )
         
-        # Translate the text
-        translated, service = translate_text(text, target_lang, source_lang)
+        # Translate the text, unless it's already in the target language
+        if source_lang.lower() == target_lang.lower():
+            translated, service = text, "unchanged"
+        else:
+            translated, service = await translate_text(
+                text, target_lang, source_lang
+            )
         
         if not translated:
             await message.reply_text("Failed to translate the text. Please try again later.")
@@ -352,8 +421,8 @@ Translate text using DeepL API (if configured) or Google Translate.
     async def list_languages(client, message):
         """List available language codes"""
         # Create a formatted list of supported languages
-        deepl_langs = ", ".join(DEEPL_LANGS)
-        google_langs = ", ".join(GOOGLE_LANGS)
+        deepl_langs = ", ".join(DEEPL_LANGS_DISPLAY)
+        google_langs = ", ".join(GOOGLE_LANGS_DISPLAY)
         
         response = (
             "**Available Languages:**\n\n"
@@ -376,7 +445,7 @@ Example: Reply to a message with `/translate es` to translate to Spanish
 """
 
 except ImportError as e:
-    print(f"Error importing required modules: {e}")
+    logger.error("Error importing required modules: %s", e)
     __HELP__ = """
 **Translate Module**
 - /translate [lang_code]: Translate replied text to specified language
@@ -4,13 +4,16 @@ Admins and sudoers can set global triggers that auto-reply to specific words or
 Supports text replies and media (photos, videos, stickers, GIFs, etc.)
 """
 
+import asyncio
+import re
+from dataclasses import dataclass
+from typing import Optional
 from pyrogram import filters, Client
 from pyrogram.types import Message
-from wbb import app, SUDOERS
-from wbb.core.decorators import sudo_required
+from wbb import app, db, SUDOERS
+from wbb.utils.permissions_utils import has_permission
 import logging
 from motor.motor_asyncio import AsyncIOMotorCollection
-from wbb.core.mongo import db
 
 logger = logging.getLogger(__name__)
 
@@ -41,42 +44,146 @@ Media trigger:
 """
 
 
+def word_pattern(trigger: str) -> str:
+    """
+    Pattern matching trigger as a whole word or phrase, "cat" doesn't
+    fire on "concatenate". Only word characters at its edges need a
+    boundary, so triggers like "?!" still fire on "what?!".
+    """
+    pattern = re.escape(trigger)
+    if re.match(r"\w", trigger):
+        pattern = r"(?<!\w)" + pattern
+    if re.match(r"\w", trigger[-1]):
+        pattern += r"(?!\w)"
+    return pattern
+
+
+# Reply method for each supported media type, in detection order
+MEDIA_REPLIES = {
+    "photo": Message.reply_photo,
+    "video": Message.reply_video,
+    "animation": Message.reply_animation,
+    "sticker": Message.reply_sticker,
+    "document": Message.reply_document,
+    "audio": Message.reply_audio,
+    "voice": Message.reply_voice,
+}
+
+
+@dataclass(slots=True, frozen=True)
+class Trigger:
+    """A cached trigger, word is its lowercased form and document _id"""
+    word: str
+    trigger: str
+    response: Optional[str] = None
+    media_id: Optional[str] = None
+    media_type: Optional[str] = None
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "Trigger":
+        return cls(
+            doc["_id"],
+            doc.get("trigger") or doc["_id"],
+            doc.get("response"),
+            doc.get("media_id"),
+            doc.get("media_type"),
+        )
+
+
 class TriggerDB:
     def __init__(self):
         self.col: AsyncIOMotorCollection = db.triggers
+        # All triggers by lowercased word, loaded on first use. Every
+        # write goes through this class and updates it in place.
+        self._cache = None
+        self._cache_lock = asyncio.Lock()
+        # All triggers fused into one pattern, rebuilt after writes
+        self._pattern = None
+        self._pattern_words = []
+
+    async def get_triggers(self) -> dict:
+        """Get all triggers, keyed by lowercased trigger"""
+        if self._cache is None:
+            async with self._cache_lock:
+                if self._cache is None:
+                    self._cache = {
+                        doc["_id"]: Trigger.from_doc(doc)
+                        async for doc in self.col.find(
+                            {},
+                            {
+                                "trigger": 1,
+                                "response": 1,
+                                "media_id": 1,
+                                "media_type": 1,
+                            },
+                        )
+                    }
+        return self._cache
+
+    async def match(self, text: str):
+        """Get the trigger found earliest in text, ignoring case"""
+        triggers = await self.get_triggers()
+        if self._pattern is None:
+            # Longest first, so a trigger wins over its own prefix
+            words = sorted(filter(None, triggers), key=len, reverse=True)
+            if not words:
+                return None
+            # Map hits back through the group name, the matched text
+            # doesn't always lowercase to its key (e.g. "ος" vs "οσ")
+            self._pattern_words = words
+            self._pattern = re.compile(
+                "|".join([
+                    f"(?P<t{i}>{word_pattern(word)})"
+                    for i, word in enumerate(words)
+                ]),
+                re.IGNORECASE,
+            )
+        match = self._pattern.search(text)
+        if not match:
+            return None
+        return triggers.get(self._pattern_words[int(match.lastgroup[1:])])
 
     async def add_trigger(self, trigger: str, response: str = None, 
                          media_id: str = None, media_type: str = None):
         """Add or update a trigger"""
         trigger_lower = trigger.lower()
+        data = {
+            "trigger": trigger,
+            "response": response,
+            "media_id": media_id,
+            "media_type": media_type,
+        }
         await self.col.update_one(
             {"_id": trigger_lower},
-            {
-                "$set": {
-                    "trigger": trigger,
-                    "response": response,
-                    "media_id": media_id,
-                    "media_type": media_type,
-                }
-            },
+            {"$set": data},
             upsert=True,
         )
+        (await self.get_triggers())[trigger_lower] = Trigger(trigger_lower, **data)
+        self._pattern = None
 
     async def get_trigger(self, trigger: str):
         """Get trigger details"""
-        return await self.col.find_one({"_id": trigger.lower()})
+        return (await self.get_triggers()).get(trigger.lower())
 
-    async def delete_trigger(self, trigger: str):
-        """Delete a trigger"""
-        await self.col.delete_one({"_id": trigger.lower()})
+    async def delete_trigger(self, trigger: str) -> bool:
+        """Delete a trigger, returns whether it existed"""
+        result = await self.col.delete_one({"_id": trigger.lower()})
+        if self._cache is not None:
+            self._cache.pop(trigger.lower(), None)
+        self._pattern = None
+        return bool(result.deleted_count)
 
     async def get_all_triggers(self):
         """Get all triggers"""
-        return await self.col.find({}).to_list(None)
+        return list((await self.get_triggers()).values())
 
-    async def clear_all(self):
-        """Clear all triggers"""
-        await self.col.delete_many({})
+    async def clear_all(self) -> int:
+        """Clear all triggers, returns how many were deleted"""
+        result = await self.col.delete_many({})
+        if self._cache is not None:
+            self._cache.clear()
+        self._pattern = None
+        return result.deleted_count
 
 
 trigger_db = TriggerDB()
@@ -87,11 +194,8 @@ async def is_admin_or_sudo(client: Client, user_id: int, chat_id: int) -> bool:
     if user_id in SUDOERS:
         return True
     
-    try:
-        member = await client.get_chat_member(chat_id, user_id)
-        return member.privileges and member.privileges.can_delete_messages
-    except:
-        return False
+    # Shared short-lived cache, refreshed on chat member updates
+    return await has_permission(chat_id, user_id, "can_delete_messages")
 
 
 @app.on_message(filters.command("addtrigger"))
@@ -117,36 +221,16 @@ async def add_trigger(client: Client, message: Message):
         trigger = " ".join(message.command[1:])
         
         # Check what type of media is being replied to
-        media_id = None
-        media_type = None
-
-        if reply_msg.photo:
-            media_id = reply_msg.photo.file_id
-            media_type = "photo"
-        elif reply_msg.video:
-            media_id = reply_msg.video.file_id
-            media_type = "video"
-        elif reply_msg.animation:
-            media_id = reply_msg.animation.file_id
-            media_type = "animation"
-        elif reply_msg.sticker:
-            media_id = reply_msg.sticker.file_id
-            media_type = "sticker"
-        elif reply_msg.document:
-            media_id = reply_msg.document.file_id
-            media_type = "document"
-        elif reply_msg.audio:
-            media_id = reply_msg.audio.file_id
-            media_type = "audio"
-        elif reply_msg.voice:
-            media_id = reply_msg.voice.file_id
-            media_type = "voice"
-        else:
+        media_type = next(
+            (kind for kind in MEDIA_REPLIES if getattr(reply_msg, kind)), None
+        )
+        if not media_type:
             await message.reply_text(
                 "❌ Unsupported media type!\n\n"
                 "Supported: Photo, Video, Sticker, GIF, Document, Audio, Voice"
             )
             return
+        media_id = getattr(reply_msg, media_type).file_id
 
         await trigger_db.add_trigger(
             trigger,
@@ -199,15 +283,13 @@ async def del_trigger(client: Client, message: Message):
         return
 
     trigger = " ".join(message.command[1:])
-    trigger_data = await trigger_db.get_trigger(trigger)
 
-    if not trigger_data:
+    if not await trigger_db.delete_trigger(trigger):
         await message.reply_text(
             f"❌ Trigger `{trigger}`  not found!"
         )
         return
 
-    await trigger_db.delete_trigger(trigger)
     await message.reply_text(
         f"✅ Trigger `{trigger}`  deleted!"
     )
@@ -226,20 +308,20 @@ async def list_triggers(client: Client, message: Message):
         )
         return
 
-    text = "📋 **All Triggers:**\n\n"
+    lines = ["📋 **All Triggers:**\n"]
     
     for i, trig in enumerate(triggers, 1):
-        trigger = trig.get("trigger", "N/A")
-        media_type = trig.get("media_type")
-        response = trig.get("response", "")
+        trigger = trig.trigger
+        media_type = trig.media_type
+        response = trig.response or ""
 
         if media_type:
-            text += f"{i}. `{trigger}`  → 📎 {media_type.upper()}\n"
+            lines.append(f"{i}. `{trigger}`  → 📎 {media_type.upper()}")
         else:
             response_preview = response[:50] + "..." if len(response) > 50 else response
-            text += f"{i}. `{trigger}`  → {response_preview}\n"
+            lines.append(f"{i}. `{trigger}`  → {response_preview}")
 
-    await message.reply_text(text)
+    await message.reply_text("\n".join(lines) + "\n")
 
 
 @app.on_message(filters.command("cleartriggers"))
@@ -251,138 +333,82 @@ async def clear_triggers(client: Client, message: Message):
         await message.reply_text("❌ Only admins and sudoers can clear triggers!")
         return
 
-    triggers = await trigger_db.get_all_triggers()
+    deleted = await trigger_db.clear_all()
     
-    if not triggers:
+    if not deleted:
         await message.reply_text("❌ No triggers to clear!")
         return
 
-    await trigger_db.clear_all()
     await message.reply_text(
-        f"✅ Cleared {len(triggers)} triggers!"
+        f"✅ Cleared {deleted} triggers!"
     )
 
 
-@app.on_message(filters.text, group=100)
-async def trigger_handler(client: Client, message: Message):
-    """Handle trigger replies"""
+async def send_trigger(message: Message, trigger_data: Trigger, report_errors: bool):
+    """Reply to message with a trigger's response"""
+    media_type = trigger_data.media_type
     
-    # Skip if message is from bot or is a command
-    if message.from_user.is_bot or message.text.startswith("/"):
-        return
+    if media_type:
+        # Media trigger
+        reply = MEDIA_REPLIES.get(media_type)
+        if not reply:
+            return
+        try:
+            await reply(message, trigger_data.media_id)
+        except Exception as e:
+            logger.error(f"Error sending media trigger: {e}")
+            if report_errors:
+                try:
+                    await message.reply_text(
+                        "⚠️ Media expired or unavailable"
+                    )
+                except:
+                    pass
+    else:
+        # Text trigger
+        response = trigger_data.response
+        if response:
+            try:
+                await message.reply_text(response)
+            except Exception as e:
+                logger.error(f"Error sending text trigger: {e}")
 
-    text = message.text.lower()
-    triggers = await trigger_db.get_all_triggers()
 
-    if not triggers:
-        return
+async def command_prefix_filter(_, __, message: Message) -> bool:
+    return message.text[0] == "/"
 
-    # Check for trigger matches
-    for trigger_data in triggers:
-        trigger_word = trigger_data.get("trigger", "").lower()
-        
-        # Skip if trigger is empty
-        if not trigger_word:
-            continue
-
-        # Check if trigger matches (exact word or phrase)
-        if trigger_word in text:
-            media_type = trigger_data.get("media_type")
-            
-            if media_type:
-                # Media trigger
-                media_id = trigger_data.get("media_id")
-                
-                try:
-                    if media_type == "photo":
-                        await message.reply_photo(media_id)
-                    elif media_type == "video":
-                        await message.reply_video(media_id)
-                    elif media_type == "animation":
-                        await message.reply_animation(media_id)
-                    elif media_type == "sticker":
-                        await message.reply_sticker(media_id)
-                    elif media_type == "document":
-                        await message.reply_document(media_id)
-                    elif media_type == "audio":
-                        await message.reply_audio(media_id)
-                    elif media_type == "voice":
-                        await message.reply_voice(media_id)
-                except Exception as e:
-                    logger.error(f"Error sending media trigger: {e}")
-                    try:
-                        await message.reply_text(
-                            "⚠️ Media expired or unavailable"
-                        )
-                    except:
-                        pass
-            else:
-                # Text trigger
-                response = trigger_data.get("response")
-                if response:
-                    try:
-                        await message.reply_text(response)
-                    except Exception as e:
-                        logger.error(f"Error sending text trigger: {e}")
-            
-            # Exit after first match
-            break
-
-
-@app.on_message(filters.media, group=99)
-async def media_trigger_handler(client: Client, message: Message):
-    """Handle triggers on media messages"""
-    
-    # Skip if message is from bot
-    if message.from_user.is_bot:
-        return
 
-    # Skip if no caption
-    if not message.caption:
-        return
+async def has_triggers_filter(_, __, message: Message) -> bool:
+    # Only the first message waits for the triggers to load, after that
+    # this is a plain check of the cached dict
+    if trigger_db._cache is None:
+        await trigger_db.get_triggers()
+    return bool(trigger_db._cache)
 
-    caption = message.caption.lower()
-    triggers = await trigger_db.get_all_triggers()
 
-    if not triggers:
-        return
+command_prefix = filters.create(command_prefix_filter)
+has_triggers = filters.create(has_triggers_filter)
+
 
+@app.on_message(
+    filters.text & has_triggers & ~filters.bot & ~command_prefix, group=100
+)
+async def trigger_handler(client: Client, message: Message):
+    """Handle trigger replies"""
+    
+    # Check for trigger matches (exact word or phrase)
+    trigger_data = await trigger_db.match(message.text)
+    if trigger_data:
+        await send_trigger(message, trigger_data, report_errors=True)
+
+
+@app.on_message(
+    filters.media & filters.caption & has_triggers & ~filters.bot, group=99
+)
+async def media_trigger_handler(client: Client, message: Message):
+    """Handle triggers on media messages"""
+    
     # Check for trigger matches in caption
-    for trigger_data in triggers:
-        trigger_word = trigger_data.get("trigger", "").lower()
-        
-        if not trigger_word:
-            continue
-
-        if trigger_word in caption:
-            media_type = trigger_data.get("media_type")
-            
-            if media_type:
-                media_id = trigger_data.get("media_id")
-                
-                try:
-                    if media_type == "photo":
-                        await message.reply_photo(media_id)
-                    elif media_type == "video":
-                        await message.reply_video(media_id)
-                    elif media_type == "animation":
-                        await message.reply_animation(media_id)
-                    elif media_type == "sticker":
-                        await message.reply_sticker(media_id)
-                    elif media_type == "document":
-                        await message.reply_document(media_id)
-                    elif media_type == "audio":
-                        await message.reply_audio(media_id)
-                    elif media_type == "voice":
-                        await message.reply_voice(media_id)
-                except Exception as e:
-                    logger.error(f"Error sending media trigger: {e}")
-            else:
-                response = trigger_data.get("response")
-                if response:
-                    try:
-                        await message.reply_text(response)
-                    except Exception as e:
-                        logger.error(f"Error sending text trigger: {e}")
-            
-            break
+    trigger_data = await trigger_db.match(message.caption)
+    if trigger_data:
+        await send_trigger(message, trigger_data, report_errors=False)
@@ -15,20 +15,17 @@ def get_fed_info(fed_id):
 
 
 async def get_fed_id(chat_id):
-    get = await fedsdb.find_one({"chat_ids.chat_id": int(chat_id)})
+    get = await fedsdb.find_one(
+        {"chat_ids.chat_id": int(chat_id)}, {"fed_id": 1}
+    )
 
     if get is None:
         return False
-    else:
-        for chat_info in get.get("chat_ids", []):
-            if chat_info["chat_id"] == int(chat_id):
-                return get["fed_id"]
-
-    return False
+    return get["fed_id"]
 
 
 async def get_feds_by_owner(owner_id):
-    cursor = fedsdb.find({"owner_id": owner_id})
+    cursor = fedsdb.find({"owner_id": owner_id}, {"fed_id": 1, "fed_name": 1})
     feds = await cursor.to_list(length=None)
     if not feds:
         return False
@@ -177,8 +174,10 @@ async def remove_fban_user(fed_id, user_id):
 
 
 async def check_banned_user(fed_id, user_id):
+    # Only the matched ban entry is returned, not the whole ban list
     result = await fedsdb.find_one(
-        {"fed_id": fed_id, "banned_users.user_id": user_id}
+        {"fed_id": fed_id, "banned_users.user_id": user_id},
+        {"banned_users.$": 1},
     )
     if result and "banned_users" in result:
         for user in result["banned_users"]:
@@ -189,7 +188,9 @@ async def check_banned_user(fed_id, user_id):
 
 
 async def get_user_fstatus(user_id):
-    cursor = fedsdb.find({"banned_users.user_id": user_id})
+    cursor = fedsdb.find(
+        {"banned_users.user_id": user_id}, {"fed_id": 1, "fed_name": 1}
+    )
     feds = await cursor.to_list(length=None)
     if not feds:
         return False
@@ -23,11 +23,15 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+import asyncio
 import codecs
 import pickle
 from string import ascii_lowercase
+from time import time
 from typing import Dict, List, Union
 
+from pymongo import ReturnDocument, UpdateOne
+
 from wbb import db
 
 # SOME THINGS ARE FUCKED UP HERE, LIKE TOGGLEABLES HAVE THEIR OWN COLLECTION
@@ -61,6 +65,55 @@ rulesdb = db.rules
 chatbotdb = db.chatbot
 
 
+async def ensure_indexes():
+    """Index the fields every lookup filters on, safe to run on each start"""
+    await asyncio.gather(
+        *(
+            collection.create_index(key)
+            for collection, key in (
+                (notesdb, "chat_id"),
+                (filtersdb, "chat_id"),
+                (warnsdb, "chat_id"),
+                (karmadb, "chat_id"),
+                (karmadb, "chat_id_toggle"),
+                (chatsdb, "chat_id"),
+                (usersdb, "user_id"),
+                (gbansdb, "user_id"),
+                (coupledb, "chat_id"),
+                (captchadb, "chat_id"),
+                (solved_captcha_db, [("chat_id", 1), ("user_id", 1)]),
+                (antiservicedb, "chat_id"),
+                (pmpermitdb, "user_id"),
+                (welcomedb, "chat_id"),
+                (blacklist_filtersdb, "chat_id"),
+                (blacklist_chatdb, "chat_id"),
+                (flood_toggle_db, "chat_id"),
+                (rssdb, "chat_id"),
+                (rulesdb, "chat_id"),
+            )
+        )
+    )
+
+
+async def _count_per_chat(collection, query: dict, size) -> tuple:
+    """Number of matching chats and the sum of `size` over them"""
+    result = await collection.aggregate(
+        [
+            {"$match": query},
+            {
+                "$group": {
+                    "_id": None,
+                    "chats": {"$sum": 1},
+                    "total": {"$sum": size},
+                }
+            },
+        ]
+    ).to_list(length=1)
+    if not result:
+        return 0, 0
+    return result[0]["chats"], result[0]["total"]
+
+
 def obj_to_str(obj):
     if not obj:
         return False
@@ -74,12 +127,11 @@ def str_to_obj(string: str):
 
 
 async def get_notes_count() -> dict:
-    chats_count = 0
-    notes_count = 0
-    async for chat in notesdb.find({"chat_id": {"$exists": 1}}):
-        notes_name = await get_note_names(chat["chat_id"])
-        notes_count += len(notes_name)
-        chats_count += 1
+    chats_count, notes_count = await _count_per_chat(
+        notesdb,
+        {"chat_id": {"$exists": 1}},
+        {"$size": {"$objectToArray": {"$ifNull": ["$notes", {}]}}},
+    )
     return {"chats_count": chats_count, "notes_count": notes_count}
 
 
@@ -134,12 +186,11 @@ async def deleteall_notes(chat_id: int):
 
 
 async def get_filters_count() -> dict:
-    chats_count = 0
-    filters_count = 0
-    async for chat in filtersdb.find({"chat_id": {"$lt": 0}}):
-        filters_name = await get_filters_names(chat["chat_id"])
-        filters_count += len(filters_name)
-        chats_count += 1
+    chats_count, filters_count = await _count_per_chat(
+        filtersdb,
+        {"chat_id": {"$lt": 0}},
+        {"$size": {"$objectToArray": {"$ifNull": ["$filters", {}]}}},
+    )
     return {
         "chats_count": chats_count,
         "filters_count": filters_count,
@@ -237,12 +288,18 @@ async def alpha_to_int(user_id_alphabet: str) -> int:
 
 
 async def get_warns_count() -> dict:
-    chats_count = 0
-    warns_count = 0
-    async for chat in warnsdb.find({"chat_id": {"$lt": 0}}):
-        for user in chat["warns"]:
-            warns_count += chat["warns"][user]["warns"]
-        chats_count += 1
+    chats_count, warns_count = await _count_per_chat(
+        warnsdb,
+        {"chat_id": {"$lt": 0}},
+        {
+            "$sum": {
+                "$map": {
+                    "input": {"$objectToArray": "$warns"},
+                    "in": "$$this.v.warns",
+                }
+            }
+        },
+    )
     return {"chats_count": chats_count, "warns_count": warns_count}
 
 
@@ -285,14 +342,18 @@ async def remove_warns(chat_id: int, name: str) -> bool:
 
 
 async def get_karmas_count() -> dict:
-    chats_count = 0
-    karmas_count = 0
-    async for chat in karmadb.find({"chat_id": {"$lt": 0}}):
-        for i in chat["karma"]:
-            karma_ = chat["karma"][i]["karma"]
-            if karma_ > 0:
-                karmas_count += karma_
-        chats_count += 1
+    chats_count, karmas_count = await _count_per_chat(
+        karmadb,
+        {"chat_id": {"$lt": 0}},
+        {
+            "$sum": {
+                "$map": {
+                    "input": {"$objectToArray": "$karma"},
+                    "in": {"$max": ["$$this.v.karma", 0]},
+                }
+            }
+        },
+    )
     return {"chats_count": chats_count, "karmas_count": karmas_count}
 
 
@@ -329,7 +390,7 @@ async def update_karma(chat_id: int, name: str, karma: dict):
 
 
 async def is_karma_on(chat_id: int) -> bool:
-    chat = await karmadb.find_one({"chat_id_toggle": chat_id})
+    chat = await karmadb.find_one({"chat_id_toggle": chat_id}, {"_id": 1})
     if not chat:
         return True
     return False
@@ -350,7 +411,7 @@ async def karma_off(chat_id: int):
 
 
 async def is_served_chat(chat_id: int) -> bool:
-    chat = await chatsdb.find_one({"chat_id": chat_id})
+    chat = await chatsdb.find_one({"chat_id": chat_id}, {"_id": 1})
     if not chat:
         return False
     return True
@@ -363,22 +424,85 @@ async def get_served_chats() -> list:
     return chats_list
 
 
+# Served chats and users are registered from every incoming message, so IDs
+# seen before skip the database and new ones are written in batches
+SERVED_FLUSH_DELAY = 5
+SERVED_CACHE_LIMIT = 100_000
+served_collections = {
+    "chats": (chatsdb, "chat_id"),
+    "users": (usersdb, "user_id"),
+}
+known_served = {"chats": set(), "users": set()}
+pending_served = {"chats": set(), "users": set()}
+served_flush_task = None
+# Held while a batch is written, so removals can't race an upsert
+served_flush_lock = asyncio.Lock()
+
+
+async def flush_served():
+    async with served_flush_lock:
+        for kind, (collection, key) in served_collections.items():
+            await _flush_served_kind(kind, collection, key)
+
+
+async def _flush_served_kind(kind: str, collection, key: str):
+    # Skip IDs removed since they were queued
+    ids = pending_served[kind] & known_served[kind]
+    pending_served[kind] = set()
+    if not ids:
+        return
+    try:
+        await collection.bulk_write(
+            [
+                UpdateOne({key: _id}, {"$setOnInsert": {key: _id}}, upsert=True)
+                for _id in ids
+            ],
+            ordered=False,
+        )
+    except Exception:
+        # Let the next message from these chats/users retry
+        known_served[kind].difference_update(ids)
+
+
+async def _flush_served_later():
+    global served_flush_task
+    await asyncio.sleep(SERVED_FLUSH_DELAY)
+    served_flush_task = None
+    await flush_served()
+
+
+def _queue_served(kind: str, _id: int):
+    global served_flush_task
+    known = known_served[kind]
+    if len(known) >= SERVED_CACHE_LIMIT:
+        known.clear()
+        # Queued IDs must stay known, or the flush would skip them
+        known.update(pending_served[kind])
+    known.add(_id)
+    pending_served[kind].add(_id)
+    if served_flush_task is None:
+        served_flush_task = asyncio.create_task(_flush_served_later())
+
+
 async def add_served_chat(chat_id: int):
-    is_served = await is_served_chat(chat_id)
-    if is_served:
+    if chat_id in known_served["chats"]:
         return
-    return await chatsdb.insert_one({"chat_id": chat_id})
+    _queue_served("chats", chat_id)
 
 
 async def remove_served_chat(chat_id: int):
-    is_served = await is_served_chat(chat_id)
-    if not is_served:
-        return
-    return await chatsdb.delete_one({"chat_id": chat_id})
+    known_served["chats"].discard(chat_id)
+    pending_served["chats"].discard(chat_id)
+    # Let a batch already being written land before deleting
+    async with served_flush_lock:
+        is_served = await is_served_chat(chat_id)
+        if not is_served:
+            return
+        return await chatsdb.delete_one({"chat_id": chat_id})
 
 
 async def is_served_user(user_id: int) -> bool:
-    user = await usersdb.find_one({"user_id": user_id})
+    user = await usersdb.find_one({"user_id": user_id}, {"_id": 1})
     if not user:
         return False
     return True
@@ -392,18 +516,17 @@ async def get_served_users() -> list:
 
 
 async def add_served_user(user_id: int):
-    is_served = await is_served_user(user_id)
-    if is_served:
+    if user_id in known_served["users"]:
         return
-    return await usersdb.insert_one({"user_id": user_id})
+    _queue_served("users", user_id)
 
 
 async def get_gbans_count() -> int:
-    return len([i async for i in gbansdb.find({"user_id": {"$gt": 0}})])
+    return await gbansdb.count_documents({"user_id": {"$gt": 0}})
 
 
 async def is_gbanned_user(user_id: int) -> bool:
-    user = await gbansdb.find_one({"user_id": user_id})
+    user = await gbansdb.find_one({"user_id": user_id}, {"_id": 1})
     if not user:
         return False
     return True
@@ -423,32 +546,41 @@ async def remove_gban_user(user_id: int):
     return await gbansdb.delete_one({"user_id": user_id})
 
 
-async def _get_lovers(chat_id: int):
-    lovers = await coupledb.find_one({"chat_id": chat_id})
-    if not lovers:
-        return {}
-    return lovers["couple"]
-
-
 async def get_couple(chat_id: int, date: str):
-    lovers = await _get_lovers(chat_id)
-    if date in lovers:
-        return lovers[date]
+    lovers = await coupledb.find_one(
+        {"chat_id": chat_id}, {f"couple.{date}": 1}
+    )
+    if lovers and date in lovers.get("couple", {}):
+        return lovers["couple"][date]
     return False
 
 
-async def save_couple(chat_id: int, date: str, couple: dict):
-    lovers = await _get_lovers(chat_id)
-    lovers[date] = couple
-    await coupledb.update_one(
+async def save_couple(chat_id: int, date: str, couple: dict) -> dict:
+    """Save the couple of `date` unless one was already saved (in a single
+    atomic update), returns the couple that is stored for that date"""
+    lovers = await coupledb.find_one_and_update(
         {"chat_id": chat_id},
-        {"$set": {"couple": lovers}},
+        [
+            {
+                "$set": {
+                    "couple": {
+                        "$mergeObjects": [
+                            {date: couple},
+                            {"$ifNull": ["$couple", {}]},
+                        ]
+                    }
+                }
+            }
+        ],
+        projection={f"couple.{date}": 1},
         upsert=True,
+        return_document=ReturnDocument.AFTER,
     )
+    return lovers["couple"][date]
 
 
 async def is_captcha_on(chat_id: int) -> bool:
-    chat = await captchadb.find_one({"chat_id": chat_id})
+    chat = await captchadb.find_one({"chat_id": chat_id}, {"_id": 1})
     if not chat:
         return True
     return False
@@ -470,7 +602,7 @@ async def captcha_off(chat_id: int):
 
 async def has_solved_captcha_once(chat_id: int, user_id: int):
     has_solved = await solved_captcha_db.find_one(
-        {"chat_id": chat_id, "user_id": user_id}
+        {"chat_id": chat_id, "user_id": user_id}, {"_id": 1}
     )
     return bool(has_solved)
 
@@ -484,7 +616,7 @@ async def save_captcha_solved(chat_id: int, user_id: int):
 
 
 async def is_antiservice_on(chat_id: int) -> bool:
-    chat = await antiservicedb.find_one({"chat_id": chat_id})
+    chat = await antiservicedb.find_one({"chat_id": chat_id}, {"_id": 1})
     if not chat:
         return True
     return False
@@ -505,7 +637,7 @@ async def antiservice_off(chat_id: int):
 
 
 async def is_pmpermit_approved(user_id: int) -> bool:
-    user = await pmpermitdb.find_one({"user_id": user_id})
+    user = await pmpermitdb.find_one({"user_id": user_id}, {"_id": 1})
     if not user:
         return False
     return True
@@ -573,12 +705,11 @@ async def get_captcha_cache():
 
 
 async def get_blacklist_filters_count() -> dict:
-    chats_count = 0
-    filters_count = 0
-    async for chat in blacklist_filtersdb.find({"chat_id": {"$lt": 0}}):
-        filters = await get_blacklisted_words(chat["chat_id"])
-        filters_count += len(filters)
-        chats_count += 1
+    chats_count, filters_count = await _count_per_chat(
+        blacklist_filtersdb,
+        {"chat_id": {"$lt": 0}},
+        {"$size": {"$ifNull": ["$filters", []]}},
+    )
     return {
         "chats_count": chats_count,
         "filters_count": filters_count,
@@ -662,7 +793,7 @@ async def show_pipes() -> list:
 
 
 async def get_sudoers() -> list:
-    sudoers = await sudoersdb.find_one({"sudo": "sudo"})
+    sudoers = await sudoersdb.find_one({"sudo": "sudo"}, {"sudoers": 1})
     if not sudoers:
         return []
     return sudoers["sudoers"]
@@ -686,23 +817,48 @@ async def remove_sudo(user_id: int) -> bool:
     return True
 
 
+# Read on every incoming message by chat_watcher, so keep it in memory
+BLACKLISTED_CHATS_TTL = 300
+blacklisted_chats_cache = {
+    "last_updated_at": 0,
+    "data": None,
+    "ids": frozenset(),
+}
+
+
 async def blacklisted_chats() -> list:
+    if (
+        blacklisted_chats_cache["data"] is not None
+        and time() - blacklisted_chats_cache["last_updated_at"]
+        < BLACKLISTED_CHATS_TTL
+    ):
+        return blacklisted_chats_cache["data"]
     blacklist_chat = []
     async for chat in blacklist_chatdb.find({"chat_id": {"$lt": 0}}):
         blacklist_chat.append(chat["chat_id"])
+    blacklisted_chats_cache["data"] = blacklist_chat
+    blacklisted_chats_cache["ids"] = frozenset(blacklist_chat)
+    blacklisted_chats_cache["last_updated_at"] = time()
     return blacklist_chat
 
 
+async def is_blacklisted_chat(chat_id: int) -> bool:
+    await blacklisted_chats()
+    return chat_id in blacklisted_chats_cache["ids"]
+
+
 async def blacklist_chat(chat_id: int) -> bool:
-    if not await blacklist_chatdb.find_one({"chat_id": chat_id}):
+    if not await blacklist_chatdb.find_one({"chat_id": chat_id}, {"_id": 1}):
         await blacklist_chatdb.insert_one({"chat_id": chat_id})
+        blacklisted_chats_cache["data"] = None
         return True
     return False
 
 
 async def whitelist_chat(chat_id: int) -> bool:
-    if await blacklist_chatdb.find_one({"chat_id": chat_id}):
+    if await blacklist_chatdb.find_one({"chat_id": chat_id}, {"_id": 1}):
         await blacklist_chatdb.delete_one({"chat_id": chat_id})
+        blacklisted_chats_cache["data"] = None
         return True
     return False
 
@@ -756,7 +912,7 @@ async def clean_restart_stage() -> dict:
 
 
 async def is_flood_on(chat_id: int) -> bool:
-    chat = await flood_toggle_db.find_one({"chat_id": chat_id})
+    chat = await flood_toggle_db.find_one({"chat_id": chat_id}, {"_id": 1})
     if not chat:
         return True
     return False
@@ -797,7 +953,7 @@ async def update_rss_feed(chat_id: int, last_title: str):
 
 
 async def is_rss_active(chat_id: int) -> bool:
-    return await rssdb.find_one({"chat_id": chat_id})
+    return await rssdb.find_one({"chat_id": chat_id}, {"_id": 1})
 
 
 async def get_rss_feeds() -> list:
@@ -814,7 +970,7 @@ async def get_rss_feeds() -> list:
 
 
 async def get_rss_feeds_count() -> int:
-    return len([i async for i in rssdb.find({"chat_id": {"$exists": 1}})])
+    return await rssdb.count_documents({"chat_id": {"$exists": 1}})
 
 
 async def check_chatbot():
@@ -33,3 +33,5 @@ taglog_group = 9
 chat_watcher_group = 10
 flood_group = 11
 autocorrect_group = 12
+command_cleaner_group = 13
+region_blocker_group = 14
@@ -60,7 +60,7 @@ from wbb import (
 from wbb.core.keyboard import ikb
 from wbb.core.tasks import _get_tasks_text, all_tasks, rm_task
 from wbb.modules.info import get_chat_info, get_user_info
-from wbb.modules.music import download_youtube_audio
+from wbb.modules.music import allow, download_sem, download_youtube_audio
 from wbb.utils.functions import test_speedtest
 from wbb.utils.pastebin import paste
 
@@ -545,7 +545,7 @@ async def speedtest_init(query):
 # CallbackQuery for the function above
 
 
-@app.on_callback_query(filters.regex("test_speedtest"))
+@app.on_callback_query(filters.regex("^test_speedtest$"))
 async def test_speedtest_cq(_, cq):
     if cq.from_user.id not in SUDOERS:
         return await cq.answer("This Isn't For You!")
@@ -613,10 +613,21 @@ async def ping_func(answers):
     return answers
 
 
-async def yt_music_func(answers, url):
+async def yt_music_func(answers, url, query):
+    # Same limits as /ytmusic, inline queries download just the same
+    if not allow(query, "ytmusic", 3, 60):
+        msg = "**ERROR**\n__TOO MANY REQUESTS, TRY AGAIN IN A MINUTE__"
+        answers.append(
+            InlineQueryResultArticle(
+                title="ERROR",
+                description="TOO MANY REQUESTS",
+                input_message_content=InputTextMessageContent(msg),
+            )
+        )
+        return answers
     arq_resp = await arq.youtube(url)
-    loop = asyncio.get_running_loop()
-    music = await loop.run_in_executor(None, download_youtube_audio, arq_resp)
+    async with download_sem:
+        music = await download_youtube_audio(arq_resp)
     if not music:
         msg = "**ERROR**\n__MUSIC TOO LONG__"
         answers.append(
@@ -627,23 +638,23 @@ async def yt_music_func(answers, url):
             )
         )
         return answers
-    (
-        title,
-        performer,
-        duration,
-        audio,
-        thumbnail,
-    ) = music
-    m = await app.send_audio(
-        MESSAGE_DUMP_CHAT,
-        audio,
-        title=title,
-        duration=duration,
-        performer=performer,
-        thumb=thumbnail,
-    )
-    os.remove(audio)
-    os.remove(thumbnail)
+    title = music["title"]
+    audio = music["audio_file"]
+    thumbnail = music["thumbnail_file"]
+    try:
+        m = await app.send_audio(
+            MESSAGE_DUMP_CHAT,
+            audio,
+            title=title,
+            duration=music["duration"],
+            performer=music["performer"],
+            thumb=thumbnail,
+            file_name=music["file_name"],
+        )
+    finally:
+        os.remove(audio)
+        if thumbnail:
+            os.remove(thumbnail)
     answers.append(
         InlineQueryResultCachedDocument(
             title=title, document_file_id=m.audio.file_id
@@ -2,11 +2,22 @@
 Logging utility module for WilliamButcherBot.
 This module provides a consistent way to log messages across the application.
 """
+import asyncio
 import logging
 import sys
+import time
+from functools import lru_cache, wraps
+from logging.handlers import RotatingFileHandler
 from typing import Optional
 
+# Shared by every handler set up here
+FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
 
+
+@lru_cache(maxsize=None)
 def setup_logger(name: str, log_level: int = logging.DEBUG, log_file: Optional[str] = None) -> logging.Logger:
     """
     Setup a logger with the specified name and log level.
@@ -26,21 +37,20 @@ def setup_logger(name: str, log_level: int = logging.DEBUG, log_file: Optional[s
     if logger.handlers:
         return logger
     
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(FORMATTER)
     logger.addHandler(console_handler)
     
     # File handler if specified
     if log_file:
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setFormatter(formatter)
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=20_000_000,
+            backupCount=3,
+            encoding='utf-8',
+        )
+        file_handler.setFormatter(FORMATTER)
         logger.addHandler(file_handler)
     
     return logger
@@ -57,16 +67,13 @@ def log_execution_time(logger: logging.Logger):
         Decorator function
     """
     def decorator(func):
-        import time
-        from functools import wraps
-        
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             logger.debug(f"Starting {func.__name__}")
             try:
                 result = await func(*args, **kwargs)
-                elapsed = time.time() - start_time
+                elapsed = time.perf_counter() - start_time
                 logger.debug(f"Completed {func.__name__} in {elapsed:.2f}s")
                 return result
             except Exception as e:
@@ -75,11 +82,11 @@ def log_execution_time(logger: logging.Logger):
                 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             logger.debug(f"Starting {func.__name__}")
             try:
                 result = func(*args, **kwargs)
-                elapsed = time.time() - start_time
+                elapsed = time.perf_counter() - start_time
                 logger.debug(f"Completed {func.__name__} in {elapsed:.2f}s")
                 return result
             except Exception as e:
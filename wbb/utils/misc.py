@@ -21,6 +21,7 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+from functools import lru_cache
 from math import ceil
 
 from pyrogram.types import InlineKeyboardButton
@@ -39,85 +40,75 @@ class EqInlineKeyboardButton(InlineKeyboardButton):
         return self.text > other.text
 
 
-def paginate_modules(page_n, module_dict, prefix, chat=None):
+@lru_cache(maxsize=64)
+def _module_rows(names, prefix, chat):
+    """Sorted module buttons grouped in rows of three, built once per menu"""
     if not chat:
         modules = sorted(
-            [
-                EqInlineKeyboardButton(
-                    x.__MODULE__,
-                    callback_data="{}_module({})".format(
-                        prefix, x.__MODULE__.replace(" ", "_").lower()
-                    ),
-                )
-                for x in module_dict.values()
-            ]
+            EqInlineKeyboardButton(
+                name,
+                callback_data="{}_module({})".format(
+                    prefix, name.replace(" ", "_").lower()
+                ),
+            )
+            for name in names
         )
     else:
         modules = sorted(
-            [
-                EqInlineKeyboardButton(
-                    x.__MODULE__,
-                    callback_data="{}_module({},{})".format(
-                        prefix, chat, x.__MODULE__.replace(" ", "_").lower()
-                    ),
-                )
-                for x in module_dict.values()
-            ]
-        )
-
-    pairs = list(zip(modules[::3], modules[1::3], modules[2::3]))
-    i = 0
-    for m in pairs:
-        for _ in m:
-            i += 1
-    if len(modules) - i == 1:
-        pairs.append((modules[-1],))
-    elif len(modules) - i == 2:
-        pairs.append(
-            (
-                modules[-2],
-                modules[-1],
+            EqInlineKeyboardButton(
+                name,
+                callback_data="{}_module({},{})".format(
+                    prefix, chat, name.replace(" ", "_").lower()
+                ),
             )
+            for name in names
         )
 
-    COLUMN_SIZE = 4
+    return tuple(tuple(modules[i : i + 3]) for i in range(0, len(modules), 3))
+
+
+COLUMN_SIZE = 4
 
-    max_num_pages = ceil(len(pairs) / COLUMN_SIZE)
-    modulo_page = page_n % max_num_pages
+
+@lru_cache(maxsize=128)
+def _module_page(names, prefix, chat, modulo_page):
+    """One page of the module menu, including its navigation row"""
+    pairs = _module_rows(names, prefix, chat)
 
     # can only have a certain amount of buttons side by side
     if len(pairs) > COLUMN_SIZE:
-        pairs = pairs[
-            modulo_page * COLUMN_SIZE : COLUMN_SIZE * (modulo_page + 1)
-        ] + [
-            (
-                EqInlineKeyboardButton(
-                    "❮",
-                    callback_data="{}_prev({})".format(prefix, modulo_page),
-                ),
-                EqInlineKeyboardButton(
-                    "Back",
-                    callback_data="{}_home({})".format(prefix, modulo_page),
-                ),
-                EqInlineKeyboardButton(
-                    "❯",
-                    callback_data="{}_next({})".format(prefix, modulo_page),
-                ),
-            )
-        ]
+        nav = (
+            EqInlineKeyboardButton(
+                "❮",
+                callback_data="{}_prev({})".format(prefix, modulo_page),
+            ),
+            EqInlineKeyboardButton(
+                "Back",
+                callback_data="{}_home({})".format(prefix, modulo_page),
+            ),
+            EqInlineKeyboardButton(
+                "❯",
+                callback_data="{}_next({})".format(prefix, modulo_page),
+            ),
+        )
     else:
-        pairs = pairs[
-            modulo_page * COLUMN_SIZE : COLUMN_SIZE * (modulo_page + 1)
-        ] + [
-            (
-                EqInlineKeyboardButton(
-                    "Back",
-                    callback_data="{}_home({})".format(prefix, modulo_page),
-                ),
-            )
-        ]
+        nav = (
+            EqInlineKeyboardButton(
+                "Back",
+                callback_data="{}_home({})".format(prefix, modulo_page),
+            ),
+        )
+
+    return pairs[
+        modulo_page * COLUMN_SIZE : COLUMN_SIZE * (modulo_page + 1)
+    ] + (nav,)
+
 
-    return pairs
+def paginate_modules(page_n, module_dict, prefix, chat=None):
+    names = tuple(x.__MODULE__ for x in module_dict.values())
+    max_num_pages = ceil(len(_module_rows(names, prefix, chat)) / COLUMN_SIZE)
+    modulo_page = page_n % max_num_pages
+    return list(_module_page(names, prefix, chat, modulo_page))
 
 
 def is_module_loaded(name):
@@ -1,8 +1,22 @@
 """
 Utility functions for handling user permissions.
 """
+from time import time
+
 from wbb import app
 
+# Admin rights rarely change between two button presses or commands, so
+# results are reused for a short while (and dropped on member updates)
+PERMISSIONS_CACHE_TTL = 60
+PERMISSIONS_CACHE_LIMIT = 10_000
+member_permissions_cache = {}
+
+
+def invalidate_member_permissions(chat_id: int, user_id: int):
+    """Forget the cached permissions of a chat member."""
+    member_permissions_cache.pop((chat_id, user_id), None)
+
+
 async def member_permissions(chat_id: int, user_id: int):
     """
     Get a list of permissions for a chat member.
@@ -14,11 +28,17 @@ async def member_permissions(chat_id: int, user_id: int):
     Returns:
         List[str]: List of permission strings the user has
     """
+    key = (chat_id, user_id)
+    cached = member_permissions_cache.get(key)
+    if cached and time() - cached["last_updated_at"] < PERMISSIONS_CACHE_TTL:
+        return cached["data"]
+
     perms = []
     try:
         member = (await app.get_chat_member(chat_id, user_id)).privileges
         if not member:
-            return []
+            _cache_member_permissions(key, perms)
+            return perms
             
         if member.can_post_messages:
             perms.append("can_post_messages")
@@ -38,7 +58,29 @@ async def member_permissions(chat_id: int, user_id: int):
             perms.append("can_pin_messages")
         if member.can_manage_video_chats:
             perms.append("can_manage_video_chats")
+        _cache_member_permissions(key, perms)
     except Exception as e:
         print(f"Error getting member permissions: {e}")
     
     return perms
+
+
+def _cache_member_permissions(key, perms):
+    if len(member_permissions_cache) >= PERMISSIONS_CACHE_LIMIT:
+        member_permissions_cache.clear()
+    member_permissions_cache[key] = {"last_updated_at": time(), "data": perms}
+
+
+async def has_permission(chat_id: int, user_id: int, permission: str) -> bool:
+    """
+    Check a single permission of a chat member.
+    
+    Args:
+        chat_id: The chat ID
+        user_id: The user ID to check
+        permission: Permission name, e.g. "can_delete_messages"
+        
+    Returns:
+        bool: Whether the member has the permission
+    """
+    return permission in await member_permissions(chat_id, user_id)
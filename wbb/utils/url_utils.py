@@ -13,19 +13,17 @@ def extract_urls(reply_markup) -> List[Tuple[str, str, str]]:
     Returns:
         List of tuples containing (button_name, button_text, button_url)
     """
-    if not reply_markup or not hasattr(reply_markup, 'inline_keyboard'):
+    keyboard = getattr(reply_markup, 'inline_keyboard', None)
+    if not keyboard:
         return []
     
-    urls = []
-    for row in reply_markup.inline_keyboard:
-        for button in row:
-            if hasattr(button, 'url'):
-                button_text = getattr(button, 'text', '')
-                button_url = getattr(button, 'url', '')
-                if button_url:
-                    urls.append((button.text, button_text, button_url))
-    
-    return urls
+    # Buttons are saved as name=[text, url], and the name is the text
+    return [
+        (button.text, button.text, button.url)
+        for row in keyboard
+        for button in row
+        if getattr(button, 'url', None)
+    ]
 
 def format_urls(urls: List[Tuple[str, str, str]]) -> str:
     """